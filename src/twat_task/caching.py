@@ -0,0 +1,220 @@
+"""
+Content-addressed cache policies for the Prefect tasks.
+
+Prefect's default cache keys hash task inputs as given. For tasks that take
+bare `Path` arguments, that means a key changes when a file is renamed but
+not when its content changes. The policies here replace the file arguments
+with a SHA-256 digest of the file content, so a key identifies the actual
+input data plus the remaining task parameters and the task source:
+
+- `FileContentInputs` hashes the content of the named path parameters.
+- `TranscriptInputs` additionally declines to cache while any requested
+  transcript artifact is missing, so that a cache hit never leaves an
+  artifact unwritten.
+
+Results are persisted, so keys and results are shared by every process and
+machine that uses the same result storage. Two environment variables,
+read at import, configure the tasks:
+
+- ``TWAT_TASK_CACHE_EXPIRATION``: cache lifetime in seconds; unset or empty
+  for entries that never expire. It also bounds the age of the per-chunk
+  transcripts that `generate_transcript_task` keeps next to the audio
+  (`twat_task.chunks.ChunkCache`), so an expired transcript is redone.
+- ``TWAT_TASK_RESULT_STORAGE``: slug of a saved Prefect storage block for
+  persisted results and cache keys, e.g. ``"s3-bucket/transcripts"`` for
+  storage shared between machines. Unset, Prefect's local storage is used,
+  whose directory is set with ``PREFECT_LOCAL_STORAGE_PATH``.
+
+To configure a task in code instead, use Prefect's `with_options`:
+
+Example:
+    >>> from datetime import timedelta
+    >>> from twat_task.task import generate_transcript_task
+    >>> daily = generate_transcript_task.with_options(
+    ...     cache_expiration=timedelta(days=1)
+    ... )
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import warnings
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from weakref import WeakValueDictionary
+
+from prefect.cache_policies import TASK_SOURCE, CachePolicy
+from prefect.utilities.hashing import hash_objects
+
+from twat_task.subtitles import ARTIFACT_SUFFIXES, artifact_path
+
+if TYPE_CHECKING:
+    from prefect.context import TaskRunContext
+
+CACHE_EXPIRATION_ENV = "TWAT_TASK_CACHE_EXPIRATION"
+RESULT_STORAGE_ENV = "TWAT_TASK_RESULT_STORAGE"
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+# One lock per file version, so concurrent tasks hash each file only once
+# while different files are hashed in parallel. Unused locks go away.
+_digest_locks: WeakValueDictionary[tuple[str, int, int], threading.Lock] = (
+    WeakValueDictionary()
+)
+_digest_locks_lock = threading.Lock()
+
+
+def file_digest(path: Path) -> str | None:
+    """
+    Return the SHA-256 hex digest of a file's content.
+
+    Digests are memoized by path, size and modification time, so unchanged
+    files are read only once per process.
+
+    Returns:
+        The digest, or `None` if the file does not exist.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digest_locks_lock:
+        lock = _digest_locks.setdefault(key, threading.Lock())
+    with lock:
+        return _digest(*key)
+
+
+@lru_cache(maxsize=4096)
+def _digest(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while block := handle.read(_HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class FileContentInputs(CachePolicy):
+    """
+    Cache key from the content of file inputs, all other inputs and the task source.
+
+    The task source is part of the key itself rather than added with
+    ``+ TASK_SOURCE``: a compound policy ignores a part whose key is `None`,
+    so it would still cache, on the source alone, a run this policy declines.
+    For the same reason, do not combine these policies with others.
+
+    Attributes:
+        files: Names of path parameters hashed by content. A path that does
+            not exist disables caching for the run.
+        exclude: Names of parameters left out of the key.
+    """
+
+    files: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+
+    def compute_key(
+        self,
+        task_ctx: TaskRunContext,
+        inputs: dict[str, Any],
+        flow_parameters: dict[str, Any],
+        **kwargs: Any,
+    ) -> str | None:
+        """Return the cache key, or `None` if the run must not be cached."""
+        keyed: dict[str, Any] = {}
+        for name, value in sorted((inputs or {}).items()):
+            if name in self.exclude:
+                continue
+            if name in self.files:
+                digest = file_digest(Path(value))
+                if digest is None:
+                    return None
+                keyed[name] = digest
+            elif isinstance(value, Path):
+                keyed[name] = str(value)
+            elif isinstance(value, list | tuple):
+                keyed[name] = [str(item) for item in value]
+            else:
+                keyed[name] = value
+        source = TASK_SOURCE.compute_key(task_ctx, inputs, flow_parameters, **kwargs)
+        return hash_objects(keyed, source, raise_on_failure=True)
+
+
+@dataclass
+class TranscriptInputs(FileContentInputs):
+    """
+    `FileContentInputs` for `generate_transcript_task`.
+
+    Artifacts are side effects that a cache hit does not reproduce, so runs
+    whose requested artifacts are not all on disk are not cached.
+    """
+
+    files: tuple[str, ...] = ("audio_path",)
+
+    def compute_key(
+        self,
+        task_ctx: TaskRunContext,
+        inputs: dict[str, Any],
+        flow_parameters: dict[str, Any],
+        **kwargs: Any,
+    ) -> str | None:
+        """Return the cache key, or `None` if an artifact is missing."""
+        audio = Path(inputs["audio_path"])
+        # Unknown kinds count as missing; the task rejects them when it runs
+        if not all(
+            kind in ARTIFACT_SUFFIXES and artifact_path(audio, kind).exists()
+            for kind in inputs.get("artifacts", ())
+        ):
+            return None
+        return super().compute_key(task_ctx, inputs, flow_parameters, **kwargs)
+
+
+def cache_expiration() -> timedelta | None:
+    """
+    Return the cache lifetime set by ``TWAT_TASK_CACHE_EXPIRATION``.
+
+    Raises:
+        ValueError: If the variable is not a positive number of seconds.
+    """
+    value = os.environ.get(CACHE_EXPIRATION_ENV)
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0.0
+    if not seconds > 0:
+        msg = f"{CACHE_EXPIRATION_ENV} must be a positive number of seconds, got {value!r}"
+        raise ValueError(msg)
+    return timedelta(seconds=seconds)
+
+
+def result_storage() -> str | None:
+    """Return the storage block slug set by ``TWAT_TASK_RESULT_STORAGE``, if any."""
+    return os.environ.get(RESULT_STORAGE_ENV) or None
+
+
+def task_cache_options(policy: CachePolicy) -> dict[str, Any]:
+    """
+    Return the `task` keyword arguments that enable caching with `policy`.
+
+    This runs when the tasks are defined, so an invalid expiration setting
+    only warns here and is ignored; `generate_transcript_task` raises on it
+    when it runs.
+    """
+    try:
+        expiration = cache_expiration()
+    except ValueError as exc:
+        warnings.warn(f"{exc}; ignoring it", RuntimeWarning, stacklevel=2)
+        expiration = None
+    return {
+        "cache_policy": policy,
+        "cache_expiration": expiration,
+        "persist_result": True,
+        "result_storage": result_storage(),
+    }
@@ -0,0 +1,443 @@
+"""
+Capacity planning for the video processing pipeline.
+
+This module provides a discrete-event simulator of the two-stage pipeline
+(audio extraction followed by transcription) driven by the cost model of the
+tasks in `twat_task.task`. Given a distribution of video durations, an
+arrival rate and a number of workers per stage, it predicts throughput,
+queue depth and latency percentiles without sleeping.
+
+`measure_run` executes the real tasks on a small batch and reports the same
+metrics, and `validate` runs both so that a prediction can be checked against
+observed behaviour before sizing a larger deployment.
+
+Example:
+    >>> from twat_task.capacity import sample_durations, simulate
+    >>> report = simulate(
+    ...     sample_durations(500, seed=1),
+    ...     arrival_rate=0.2,
+    ...     extract_workers=2,
+    ...     transcribe_workers=4,
+    ... )
+    >>> report.p95_latency  # doctest: +SKIP
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from twat_task.stats import percentile
+from twat_task.task import (
+    CHUNK_CALL_SECONDS,
+    CHUNK_SECONDS,
+    EXTRACT_SETUP_SECONDS,
+    EXTRACT_STEP_SECONDS,
+    EXTRACT_STEPS,
+    TRANSCRIBE_SETUP_SECONDS,
+    extract_audio_task,
+    generate_transcript_task,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from pathlib import Path
+
+# Range of the `duration` values produced by the mock `extract_audio_task`.
+MIN_MOCK_DURATION = 60
+MAX_MOCK_DURATION = 3600
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """
+    Service times of the pipeline stages, in seconds.
+
+    The defaults mirror the delays simulated by the mock tasks: a fixed
+    extraction time, and a transcription time made of a fixed overhead plus
+    one call per full chunk of audio.
+    """
+
+    extract_seconds: float = (
+        EXTRACT_SETUP_SECONDS + EXTRACT_STEPS * EXTRACT_STEP_SECONDS
+    )
+    transcribe_setup_seconds: float = TRANSCRIBE_SETUP_SECONDS
+    chunk_seconds: int = CHUNK_SECONDS
+    chunk_call_seconds: float = CHUNK_CALL_SECONDS
+
+    def extract_time(self, duration: int) -> float:  # noqa: ARG002
+        """Return the time needed to extract audio from a video of `duration` seconds."""
+        return self.extract_seconds
+
+    def transcribe_time(self, duration: int) -> float:
+        """Return the time needed to transcribe `duration` seconds of audio."""
+        chunks = duration // self.chunk_seconds
+        return self.transcribe_setup_seconds + chunks * self.chunk_call_seconds
+
+    def service_time(self, duration: int) -> float:
+        """Return the total processing time of one video, excluding queueing."""
+        return self.extract_time(duration) + self.transcribe_time(duration)
+
+
+@dataclass(frozen=True)
+class JobTrace:
+    """Timeline of one video through the pipeline, in seconds from the start."""
+
+    duration: int
+    arrival: float
+    extract_start: float
+    extract_end: float
+    transcribe_start: float
+    transcribe_end: float
+
+    @property
+    def latency(self) -> float:
+        """Time from arrival until the transcript is available."""
+        return self.transcribe_end - self.arrival
+
+
+@dataclass(frozen=True)
+class CapacityReport:
+    """
+    Throughput, queueing and latency figures for a batch of videos.
+
+    Attributes:
+        jobs: Number of videos processed.
+        makespan: Time from the first arrival to the last completion.
+        throughput: Completed videos per second over the makespan.
+        mean_queue_depth: Time-averaged number of videos waiting for a worker
+            in either stage.
+        max_queue_depth: Largest number of videos waiting at any time.
+        mean_latency: Mean time from arrival to completion.
+        p50_latency: Median latency.
+        p95_latency: 95th percentile latency.
+        p99_latency: 99th percentile latency.
+        traces: Per-video timelines the figures were computed from.
+    """
+
+    jobs: int
+    makespan: float
+    throughput: float
+    mean_queue_depth: float
+    max_queue_depth: int
+    mean_latency: float
+    p50_latency: float
+    p95_latency: float
+    p99_latency: float
+    traces: tuple[JobTrace, ...] = field(default=(), repr=False)
+
+    @classmethod
+    def from_traces(cls, traces: Sequence[JobTrace]) -> CapacityReport:
+        """Compute the report for a set of job timelines."""
+        if not traces:
+            return cls(0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0)
+
+        first = min(t.arrival for t in traces)
+        last = max(t.transcribe_end for t in traces)
+        makespan = last - first
+        latencies = sorted(t.latency for t in traces)
+
+        # Waiting jobs change by +1 when a job enters a queue and by -1 when
+        # a worker picks it up.
+        changes: dict[float, int] = {}
+        for t in traces:
+            for moment, delta in (
+                (t.arrival, 1),
+                (t.extract_start, -1),
+                (t.extract_end, 1),
+                (t.transcribe_start, -1),
+            ):
+                changes[moment] = changes.get(moment, 0) + delta
+        depth = max_depth = 0
+        area = 0.0
+        previous = first
+        for moment in sorted(changes):
+            area += depth * (moment - previous)
+            depth += changes[moment]
+            max_depth = max(max_depth, depth)
+            previous = moment
+
+        return cls(
+            jobs=len(traces),
+            makespan=makespan,
+            throughput=len(traces) / makespan if makespan > 0 else math.inf,
+            mean_queue_depth=area / makespan if makespan > 0 else 0.0,
+            max_queue_depth=max_depth,
+            mean_latency=sum(latencies) / len(latencies),
+            p50_latency=percentile(latencies, 50),
+            p95_latency=percentile(latencies, 95),
+            p99_latency=percentile(latencies, 99),
+            traces=tuple(traces),
+        )
+
+
+def sample_durations(
+    count: int,
+    *,
+    low: int = MIN_MOCK_DURATION,
+    high: int = MAX_MOCK_DURATION,
+    seed: int | None = None,
+) -> list[int]:
+    """
+    Draw video durations from the uniform distribution used by the mock tasks.
+
+    Args:
+        count: Number of durations to draw.
+        low: Shortest duration, in seconds.
+        high: Longest duration, in seconds.
+        seed: Seed for reproducible samples.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    return [rng.randint(low, high) for _ in range(count)]
+
+
+def simulate(  # noqa: PLR0913
+    durations: Iterable[int],
+    *,
+    arrival_rate: float | None = None,
+    extract_workers: int = 1,
+    transcribe_workers: int = 1,
+    cost_model: CostModel | None = None,
+    seed: int | None = None,
+) -> CapacityReport:
+    """
+    Predict pipeline behaviour with a discrete-event simulation.
+
+    Videos arrive as a Poisson process, wait in a FIFO queue for a free
+    extraction worker, then wait in a second FIFO queue for a free
+    transcription worker. No real time passes.
+
+    Args:
+        durations: Audio duration of each video, in seconds, in arrival order.
+        arrival_rate: Mean arrivals per second. `None` means the whole batch
+            is available at time zero, as when draining a backlog.
+        extract_workers: Number of concurrent extraction workers.
+        transcribe_workers: Number of concurrent transcription workers.
+        cost_model: Service times to use. Defaults to the mock task costs.
+        seed: Seed for the arrival process.
+
+    Returns:
+        The predicted `CapacityReport`.
+
+    Raises:
+        ValueError: If a worker count or the arrival rate is not positive.
+    """
+    if extract_workers < 1 or transcribe_workers < 1:
+        msg = "Each stage needs at least one worker"
+        raise ValueError(msg)
+    if arrival_rate is not None and arrival_rate <= 0:
+        msg = f"Arrival rate must be positive, got {arrival_rate}"
+        raise ValueError(msg)
+
+    model = cost_model or CostModel()
+    jobs = list(durations)
+    arrivals = _arrival_times(len(jobs), arrival_rate, seed)
+
+    events = _EventQueue()
+    for job, moment in enumerate(arrivals):
+        events.push(moment, "arrive", job)
+    extract = _Stage(extract_workers, len(jobs))
+    transcribe = _Stage(transcribe_workers, len(jobs))
+
+    while events:
+        now, kind, job = events.pop()
+        if kind == "arrive":
+            extract.queue.append(job)
+        elif kind == "extracted":
+            extract.finish(job, now)
+            transcribe.queue.append(job)
+        else:
+            transcribe.finish(job, now)
+
+        for job_started in extract.dispatch(now):
+            events.push(
+                now + model.extract_time(jobs[job_started]), "extracted", job_started
+            )
+        for job_started in transcribe.dispatch(now):
+            events.push(
+                now + model.transcribe_time(jobs[job_started]),
+                "transcribed",
+                job_started,
+            )
+
+    return CapacityReport.from_traces(
+        [
+            JobTrace(
+                duration=jobs[i],
+                arrival=arrivals[i],
+                extract_start=extract.start[i],
+                extract_end=extract.end[i],
+                transcribe_start=transcribe.start[i],
+                transcribe_end=transcribe.end[i],
+            )
+            for i in range(len(jobs))
+        ]
+    )
+
+
+def _arrival_times(count: int, rate: float | None, seed: int | None) -> list[float]:
+    """Return Poisson arrival times starting at zero, or all zeros without a rate."""
+    rng = random.Random(seed)  # noqa: S311
+    arrivals: list[float] = []
+    now = 0.0
+    for _ in range(count):
+        arrivals.append(now)
+        if rate is not None:
+            now += rng.expovariate(rate)
+    return arrivals
+
+
+class _EventQueue:
+    """Time-ordered simulation events; ties keep insertion order."""
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._sequence = 0
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def push(self, moment: float, kind: str, job: int) -> None:
+        heapq.heappush(self._heap, (moment, self._sequence, kind, job))
+        self._sequence += 1
+
+    def pop(self) -> tuple[float, str, int]:
+        moment, _, kind, job = heapq.heappop(self._heap)
+        return moment, kind, job
+
+
+class _Stage:
+    """A pool of identical workers fed by a FIFO queue."""
+
+    def __init__(self, workers: int, jobs: int) -> None:
+        self.free = workers
+        self.queue: deque[int] = deque()
+        self.start = [0.0] * jobs
+        self.end = [0.0] * jobs
+
+    def dispatch(self, now: float) -> list[int]:
+        """Hand queued jobs to free workers and return the jobs started."""
+        started = []
+        while self.free and self.queue:
+            job = self.queue.popleft()
+            self.free -= 1
+            self.start[job] = now
+            started.append(job)
+        return started
+
+    def finish(self, job: int, now: float) -> None:
+        """Release the worker that was processing `job`."""
+        self.free += 1
+        self.end[job] = now
+
+
+def measure_run(
+    video_paths: Sequence[Path],
+    *,
+    extract_workers: int = 1,
+    transcribe_workers: int = 1,
+    clock: Callable[[], float] = time.perf_counter,
+) -> CapacityReport:
+    """
+    Run the real tasks on a batch and report the observed behaviour.
+
+    All videos are submitted at once. Extraction always runs, even if an
+    audio file already exists, so that the run matches what `simulate`
+    models. Task functions are called directly, without Prefect
+    orchestration, so the figures reflect the work itself.
+
+    Args:
+        video_paths: Videos to process. Keep the batch small; this sleeps
+            for real.
+        extract_workers: Number of concurrent extraction workers.
+        transcribe_workers: Number of concurrent transcription workers.
+        clock: Time source of the observed timelines, in seconds.
+
+    Returns:
+        The observed `CapacityReport`, with durations read from the
+        extracted audio metadata.
+    """
+    audio_paths = [video.with_suffix(".mp3") for video in video_paths]
+    count = len(video_paths)
+    extract_start = [0.0] * count
+    extract_end = [0.0] * count
+    transcribe_start = [0.0] * count
+    transcribe_end = [0.0] * count
+    origin = clock()
+
+    def extract(i: int) -> int:
+        extract_start[i] = clock() - origin
+        extract_audio_task.fn(video_paths[i], audio_paths[i])
+        extract_end[i] = clock() - origin
+        return i
+
+    def transcribe(i: int) -> None:
+        transcribe_start[i] = clock() - origin
+        generate_transcript_task.fn(audio_paths[i])
+        transcribe_end[i] = clock() - origin
+
+    with (
+        ThreadPoolExecutor(extract_workers) as extract_pool,
+        ThreadPoolExecutor(transcribe_workers) as transcribe_pool,
+    ):
+        pending = [extract_pool.submit(extract, i) for i in range(count)]
+        transcriptions = [
+            transcribe_pool.submit(transcribe, done.result())
+            for done in as_completed(pending)
+        ]
+        for transcription in transcriptions:
+            transcription.result()
+
+    return CapacityReport.from_traces(
+        [
+            JobTrace(
+                duration=int(json.loads(audio_paths[i].read_text())["duration"]),
+                arrival=0.0,
+                extract_start=extract_start[i],
+                extract_end=extract_end[i],
+                transcribe_start=transcribe_start[i],
+                transcribe_end=transcribe_end[i],
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def validate(
+    video_paths: Sequence[Path],
+    *,
+    extract_workers: int = 1,
+    transcribe_workers: int = 1,
+    cost_model: CostModel | None = None,
+    clock: Callable[[], float] = time.perf_counter,
+) -> tuple[CapacityReport, CapacityReport]:
+    """
+    Check the simulator against a short real run.
+
+    The batch is processed for real with `measure_run`, then simulated with
+    the durations that run produced and the same worker counts. `clock` is
+    passed to `measure_run`.
+
+    Returns:
+        A `(predicted, observed)` pair of reports.
+    """
+    observed = measure_run(
+        video_paths,
+        extract_workers=extract_workers,
+        transcribe_workers=transcribe_workers,
+        clock=clock,
+    )
+    predicted = simulate(
+        [t.duration for t in observed.traces],
+        extract_workers=extract_workers,
+        transcribe_workers=transcribe_workers,
+        cost_model=cost_model,
+    )
+    return predicted, observed
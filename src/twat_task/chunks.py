@@ -0,0 +1,311 @@
+"""
+Chunk-level helpers for the transcription path.
+
+`generate_transcript_task` transcribes audio in fixed-length chunks. This
+module maps time ranges to chunk indices, reads chunk data from a read-only
+memory map of the audio file, and keeps a per-chunk result cache next to the
+audio file, so that repeated or overlapping window queries only transcribe
+chunks that were never processed before.
+
+Chunk data is handed out as `memoryview` slices of the mapping, so no chunk
+is copied, and all workers on one host share the file's page cache instead
+of each holding a private copy.
+
+The cache lives in ``<audio>.chunks.json`` and is tied to the size and
+modification time of the audio file; it is discarded when the audio changes.
+Entries can also be given a maximum age, after which they are transcribed
+again; `generate_transcript_task` uses the ``TWAT_TASK_CACHE_EXPIRATION``
+setting of `twat_task.caching`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import math
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from datetime import timedelta
+    from pathlib import Path
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+CACHE_SUFFIX = ".chunks.json"
+METADATA_MAX_BYTES = 64 * 1024  # Size of the header the metadata is read from
+
+# Serializes read-merge-write cycles on cache files within this process.
+_cache_lock = threading.Lock()
+
+
+def check_time_range(start: float | None, end: float | None) -> None:
+    """
+    Check a time range in seconds; `None` leaves a side open.
+
+    Raises:
+        ValueError: If the range is negative or empty.
+    """
+    if (start is not None and start < 0) or (end is not None and end < 0):
+        msg = f"Time range must not be negative, got start={start}, end={end}"
+        raise ValueError(msg)
+    if start is not None and end is not None and end <= start:
+        msg = f"Time range end ({end}) must be after its start ({start})"
+        raise ValueError(msg)
+
+
+def chunk_range(
+    duration: int,
+    chunk_seconds: int,
+    start: float | None = None,
+    end: float | None = None,
+) -> range:
+    """
+    Return the indices of the full chunks overlapping a time range.
+
+    Only full chunks are transcribed, as in `generate_transcript_task`;
+    a trailing partial chunk is ignored.
+
+    Args:
+        duration: Audio duration in seconds.
+        chunk_seconds: Length of one chunk in seconds.
+        start: Start of the range in seconds, or `None` for the beginning.
+        end: End of the range in seconds, or `None` for the end of the audio.
+
+    Raises:
+        ValueError: If the range is negative or empty.
+    """
+    check_time_range(start, end)
+    chunks = duration // chunk_seconds
+    first = math.floor(start / chunk_seconds) if start is not None else 0
+    last = math.ceil(end / chunk_seconds) if end is not None else chunks
+    return range(min(first, chunks), min(last, chunks))
+
+
+class AudioChunkReader:
+    """
+    Zero-copy access to the chunks of an audio file.
+
+    The file is memory-mapped read-only on `open`; `chunk` returns slices of
+    the mapping by byte offset. Offsets follow from the ``bitrate`` in the
+    metadata, or, without one, from spreading the file evenly over its
+    ``duration``.
+
+    Args:
+        audio_path: The audio file to read.
+
+    Example:
+        >>> with AudioChunkReader(audio_path) as reader:  # doctest: +SKIP
+        ...     with reader.chunk(3, 30) as data:
+        ...         transcribe(data)
+    """
+
+    def __init__(self, audio_path: Path) -> None:
+        self.audio_path = audio_path
+        self._mmap: mmap.mmap | None = None
+        self._view: memoryview | None = None
+        self._metadata: dict[str, Any] | None = None
+
+    def __enter__(self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Map the audio file into memory."""
+        with self.audio_path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            # Empty files cannot be mapped; they read as no data
+            if size:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            else:
+                self._view = memoryview(b"")
+
+    def close(self) -> None:
+        """
+        Unmap the file.
+
+        A view from `chunk` still in use, e.g. by a hedged attempt that lost,
+        keeps the mapping alive until it is released.
+        """
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            with contextlib.suppress(BufferError):
+                self._mmap.close()
+            self._mmap = None
+
+    @property
+    def data(self) -> memoryview:
+        """
+        The whole mapped file.
+
+        Raises:
+            ValueError: If the reader is not open.
+        """
+        if self._view is None:
+            msg = f"{type(self).__name__} for {self.audio_path} is not open"
+            raise ValueError(msg)
+        return self._view
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """
+        The metadata of the audio file.
+
+        The mock audio files start with a JSON object of metadata, which
+        stands in for a container header: only the first
+        `METADATA_MAX_BYTES` of the mapping are copied and parsed, and any
+        audio data after the header is never read here.
+
+        Raises:
+            ValueError: If the file does not start with a JSON object that
+                fits in `METADATA_MAX_BYTES`.
+        """
+        if self._metadata is None:
+            with self.data[:METADATA_MAX_BYTES] as header:
+                text = header.tobytes().decode("utf-8", errors="replace")
+            try:
+                metadata, _ = json.JSONDecoder().raw_decode(text)
+            except ValueError:
+                metadata = None
+            if not isinstance(metadata, dict):
+                msg = (
+                    f"{self.audio_path} does not start with JSON metadata "
+                    f"of at most {METADATA_MAX_BYTES} bytes"
+                )
+                raise ValueError(msg)
+            self._metadata = metadata
+        return self._metadata
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Bytes of audio data per second, used to locate chunks."""
+        match = re.fullmatch(
+            r"(\d+(?:\.\d+)?)\s*kbps", str(self.metadata.get("bitrate"))
+        )
+        if match:
+            return float(match.group(1)) * 1000 / 8
+        duration = self.metadata.get("duration")
+        if isinstance(duration, int | float) and duration > 0:
+            return len(self.data) / duration
+        return 0.0
+
+    @contextlib.contextmanager
+    def chunk(self, index: int, chunk_seconds: int) -> Iterator[memoryview]:
+        """
+        Yield the bytes of chunk `index` as a view into the mapping.
+
+        The view is released on exit, so keep it inside the ``with`` block.
+        Chunks past the end of the file are empty.
+        """
+        rate = self.bytes_per_second if len(self.data) else 0.0
+        start = min(round(index * chunk_seconds * rate), len(self.data))
+        end = min(round((index + 1) * chunk_seconds * rate), len(self.data))
+        view = self.data[start:end]
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+class ChunkCache:
+    """
+    Persistent transcripts of individual chunks of one audio file.
+
+    Args:
+        audio_path: The audio file whose chunks are cached.
+        max_age: How long an entry stays valid after it was saved, or `None`
+            for entries that never expire.
+
+    Example:
+        >>> cache = ChunkCache(audio_path)  # doctest: +SKIP
+        >>> cache.get(3) or cache.put(3, transcribe(3))  # doctest: +SKIP
+        >>> cache.save()  # doctest: +SKIP
+    """
+
+    def __init__(self, audio_path: Path, *, max_age: timedelta | None = None) -> None:
+        self.audio_path = audio_path
+        self.path = audio_path.with_suffix(CACHE_SUFFIX)
+        self.max_age = max_age
+        self._fingerprint = self._current_fingerprint()
+        self._chunks = {i: text for i, (text, _) in self._load().items()}
+        self._dirty: dict[int, tuple[str, float]] = {}
+
+    def get(self, index: int) -> str | None:
+        """Return the cached transcript of chunk `index`, if any."""
+        return self._chunks.get(index)
+
+    def put(self, index: int, text: str) -> str:
+        """Cache the transcript of chunk `index` and return it."""
+        self._chunks[index] = text
+        self._dirty[index] = (text, time.time())
+        return text
+
+    def save(self) -> None:
+        """
+        Write new entries to disk.
+
+        Entries saved meanwhile by other runs on the same audio are merged
+        in, and the file is replaced atomically.
+        """
+        if not self._dirty:
+            return
+        with _cache_lock:
+            merged = self._load()
+            merged.update(self._dirty)
+            payload = {
+                "fingerprint": self._fingerprint,
+                "chunks": {str(i): text for i, (text, _) in sorted(merged.items())},
+                "saved": {str(i): saved for i, (_, saved) in sorted(merged.items())},
+            }
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as handle:
+                    json.dump(payload, handle)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        self._dirty.clear()
+
+    def _current_fingerprint(self) -> list[int]:
+        stat = self.audio_path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _load(self) -> dict[int, tuple[str, float]]:
+        """Return the unexpired entries on disk with the time they were saved."""
+        try:
+            payload: dict[str, Any] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if payload.get("fingerprint") != self._fingerprint:
+            return {}
+        saved = payload.get("saved", {})
+        oldest = (
+            time.time() - self.max_age.total_seconds()
+            if self.max_age is not None
+            else None
+        )
+        entries = {}
+        for i, text in payload.get("chunks", {}).items():
+            saved_at = float(saved.get(i, 0.0))
+            if oldest is None or saved_at >= oldest:
+                entries[int(i)] = (str(text), saved_at)
+        return entries
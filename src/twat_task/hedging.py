@@ -0,0 +1,324 @@
+"""
+Hedged execution of transcription chunk calls.
+
+A video's transcript is complete only when its slowest chunk call returns,
+so at scale tail latency is dominated by a few straggling calls. A `Hedger`
+starts a duplicate attempt of a call that has not finished within a latency
+percentile of recent calls; the first successful result wins and the other
+attempt is ignored.
+
+Hedges cost extra calls, so their share is capped by a budget: a hedge only
+fires while the number of hedges stays below ``budget`` times the number of
+calls. Each attempt goes through the rate limiter. Latency is measured from
+the moment an attempt gets through it, so throttling is never mistaken for a
+straggler, and a hedge that would have to wait for the limiter is not
+started. `Hedger.metrics` reports how often hedges fired and how often the
+hedge beat the original attempt.
+
+The hedger used by `generate_transcript_task` is configured with
+`configure_hedger` or, for worker processes, with environment variables:
+
+- ``TWAT_TASK_HEDGE_PERCENTILE``: latency percentile after which a call is
+  hedged, e.g. ``95``.
+- ``TWAT_TASK_HEDGE_BUDGET``: maximum share of extra calls, e.g. ``0.05``.
+
+Without any configuration calls are not hedged.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TypeVar
+
+from twat_task.stats import percentile
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from twat_task.ratelimit import RateLimiter
+
+R = TypeVar("R")
+
+
+class SupersededError(Exception):
+    """Raised in an attempt that started after its call was answered."""
+
+
+@dataclass(frozen=True)
+class HedgeMetrics:
+    """
+    Hedging statistics of a `Hedger` in the current process.
+
+    Attributes:
+        calls: Number of calls made through the hedger.
+        hedged: Number of calls for which a hedge was started.
+        hedge_wins: Number of hedged calls answered by the hedge.
+        budget_denied: Number of stragglers not hedged because the budget
+            was used up.
+        throttled: Number of stragglers not hedged because the rate limiter
+            would have made the hedge wait.
+    """
+
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    budget_denied: int = 0
+    throttled: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Share of calls that were hedged."""
+        return self.hedged / self.calls if self.calls else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """Share of hedges that answered first."""
+        return self.hedge_wins / self.hedged if self.hedged else 0.0
+
+
+class Hedger:
+    """
+    Run calls with a duplicate attempt for stragglers.
+
+    Args:
+        percentile: Latency percentile of recent attempts after which a
+            call is hedged, or `None` to disable hedging.
+        budget: Maximum number of hedges as a share of calls.
+        min_samples: Attempts to observe before the percentile is trusted.
+        initial_delay: Hedging delay in seconds used until `min_samples`
+            attempts were observed, or `None` to not hedge until then.
+        window: Number of recent attempt latencies kept.
+        max_workers: Threads running attempts. An attempt that lost keeps
+            its thread until it returns.
+
+    Example:
+        >>> hedger = Hedger(percentile=95, budget=0.05)
+        >>> hedger.call(lambda: "result")
+        'result'
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        percentile: float | None = None,
+        *,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        initial_delay: float | None = None,
+        window: int = 1000,
+        max_workers: int = 64,
+    ) -> None:
+        if percentile is not None and not 0 < percentile < 100:  # noqa: PLR2004
+            msg = f"Hedging percentile must be between 0 and 100, got {percentile}"
+            raise ValueError(msg)
+        if not 0 <= budget <= 1:
+            msg = f"Hedging budget must be between 0 and 1, got {budget}"
+            raise ValueError(msg)
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._metrics = HedgeMetrics()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether calls may be hedged."""
+        return self.percentile is not None
+
+    def delay(self) -> float | None:
+        """Return the current hedging delay in seconds, or `None` for no hedge."""
+        if self.percentile is None:
+            return None
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        return percentile(samples, self.percentile)
+
+    def call(self, fn: Callable[[], R], *, limiter: RateLimiter | None = None) -> R:
+        """
+        Call `fn`, starting a second attempt if the first one straggles.
+
+        `fn` may run twice, concurrently, so it must be safe to repeat.
+
+        Args:
+            fn: The call to make.
+            limiter: Rate limiter every attempt goes through. The wait for it
+                happens before an attempt starts and does not count as
+                latency; a hedge only starts if the limiter lets it through
+                without waiting.
+
+        Returns:
+            The result of the first attempt that succeeds.
+
+        Raises:
+            Exception: The error of the original attempt if all attempts fail.
+        """
+        if not self.enabled:
+            with limiter.acquire() if limiter is not None else nullcontext():
+                return fn()
+        # Set once the call has a result, so a losing attempt that only
+        # starts afterwards skips `fn`.
+        settled = threading.Event()
+        slot = ExitStack()
+        if limiter is not None:
+            slot.enter_context(limiter.acquire())
+        primary = self._submit(fn, slot, settled)
+        self._update(calls=1)
+        try:
+            delay = self.delay()
+            done, _ = wait([primary], timeout=delay)
+            if done or delay is None:
+                return primary.result()
+
+            with self._lock:
+                allowed = self._metrics.hedged < self.budget * self._metrics.calls
+            if not allowed:
+                self._update(budget_denied=1)
+                return primary.result()
+
+            slot = ExitStack()
+            if limiter is not None and not slot.enter_context(limiter.try_acquire()):
+                slot.close()
+                self._update(throttled=1)
+                return primary.result()
+
+            self._update(hedged=1)
+            hedge = self._submit(fn, slot, settled)
+            winner = self._first_success(primary, hedge)
+            if winner is hedge:
+                self._update(hedge_wins=1)
+            return winner.result()
+        finally:
+            settled.set()
+
+    def metrics(self) -> HedgeMetrics:
+        """Return a snapshot of the hedging metrics of this process."""
+        with self._lock:
+            return self._metrics
+
+    def _submit(
+        self, fn: Callable[[], R], slot: ExitStack, settled: threading.Event
+    ) -> Future[R]:
+        """Run an attempt holding `slot`, which is released when it ends."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="twat-task-hedge"
+                )
+            executor = self._executor
+        try:
+            future = executor.submit(self._attempt, fn, slot, settled)
+        except BaseException:
+            slot.close()
+            raise
+        # An attempt cancelled before it started never runs to release it
+        future.add_done_callback(lambda f: slot.close() if f.cancelled() else None)
+        return future
+
+    def _attempt(
+        self, fn: Callable[[], R], slot: ExitStack, settled: threading.Event
+    ) -> R:
+        """Run one attempt, recording the latency of `fn` if it succeeds."""
+        with slot:
+            if settled.is_set():
+                msg = "The call was answered by another attempt"
+                raise SupersededError(msg)
+            started = time.monotonic()
+            result = fn()
+            # Before the future completes, so a queued loser sees it at once
+            settled.set()
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+            return result
+
+    def _first_success(self, primary: Future[R], hedge: Future[R]) -> Future[R]:
+        """Return the first attempt to succeed, or `primary` if both fail."""
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future in done and future.exception() is None:
+                    for other in pending:
+                        other.cancel()  # Only stops attempts not yet started
+                    return future
+        return primary
+
+    def _update(
+        self,
+        *,
+        calls: int = 0,
+        hedged: int = 0,
+        hedge_wins: int = 0,
+        budget_denied: int = 0,
+        throttled: int = 0,
+    ) -> None:
+        with self._lock:
+            m = self._metrics
+            self._metrics = HedgeMetrics(
+                calls=m.calls + calls,
+                hedged=m.hedged + hedged,
+                hedge_wins=m.hedge_wins + hedge_wins,
+                budget_denied=m.budget_denied + budget_denied,
+                throttled=m.throttled + throttled,
+            )
+
+
+_hedger: Hedger | None = None
+_hedger_lock = threading.Lock()
+
+
+def configure_hedger(
+    percentile: float | None = None,
+    *,
+    budget: float = 0.05,
+    min_samples: int = 20,
+    initial_delay: float | None = None,
+) -> Hedger:
+    """
+    Set the hedger used by the transcription tasks of this process.
+
+    Calling it without arguments disables hedging. See `Hedger` for the
+    meaning of the arguments.
+
+    Returns:
+        The new hedger, whose `metrics()` report the tasks' hedges.
+    """
+    global _hedger  # noqa: PLW0603
+    with _hedger_lock:
+        _hedger = Hedger(
+            percentile,
+            budget=budget,
+            min_samples=min_samples,
+            initial_delay=initial_delay,
+        )
+        return _hedger
+
+
+def get_hedger() -> Hedger:
+    """
+    Return the hedger used by the transcription tasks of this process.
+
+    On first use the hedger is built from the ``TWAT_TASK_HEDGE_*``
+    environment variables described in the module documentation.
+    """
+    global _hedger  # noqa: PLW0603
+    with _hedger_lock:
+        if _hedger is None:
+            level = os.environ.get("TWAT_TASK_HEDGE_PERCENTILE")
+            budget = os.environ.get("TWAT_TASK_HEDGE_BUDGET")
+            _hedger = Hedger(
+                float(level) if level else None,
+                budget=float(budget) if budget else 0.05,
+            )
+        return _hedger
@@ -0,0 +1,275 @@
+"""
+Opt-in profiling of task runs with cProfile and tracemalloc.
+
+When profiling is on, every run of `extract_audio_task` and
+`generate_transcript_task` is wrapped with a cProfile profiler and a pair of
+tracemalloc snapshots. Each run writes two files to the profile directory:
+
+- ``<task>-<time>-<pid>-<n>.prof``: cProfile statistics, readable with
+  `pstats`.
+- ``<task>-<time>-<pid>-<n>.alloc.json``: allocation sites that grew during
+  the run, largest first.
+
+`profile_report` aggregates all files of a directory, e.g. a whole batch,
+into the top functions by cumulative time and the top allocation sites.
+
+Profiling is off by default. Turn it on with the ``TWAT_TASK_PROFILE_DIR``
+environment variable, which worker processes inherit, or by calling
+`enable_profiling` in the current process.
+
+Example:
+    >>> from pathlib import Path
+    >>> from twat_task.profiling import enable_profiling, profile_report
+    >>> enable_profiling(Path("profiles"))
+    >>> # ... run a batch ...
+    >>> print(profile_report(Path("profiles")).format())  # doctest: +SKIP
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import itertools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+PROFILE_DIR_ENV = "TWAT_TASK_PROFILE_DIR"
+
+# Allocation sites kept per run; the report aggregates these.
+ALLOCATION_SITES_PER_RUN = 50
+
+_profile_dir: Path | None = None
+_run_counter = itertools.count()
+
+# cProfile supports one active profiler at a time on recent Pythons, so runs
+# that overlap in other threads are only traced for memory.
+_cprofile_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False  # Whether tracing was started here, not by the host
+
+
+def enable_profiling(directory: Path | None) -> None:
+    """
+    Turn profiling on for this process, writing profiles to `directory`.
+
+    Passing `None` goes back to the ``TWAT_TASK_PROFILE_DIR`` setting.
+    """
+    global _profile_dir  # noqa: PLW0603
+    _profile_dir = directory
+
+
+def profile_dir() -> Path | None:
+    """Return the directory profiles are written to, or `None` if profiling is off."""
+    if _profile_dir is not None:
+        return _profile_dir
+    env = os.environ.get(PROFILE_DIR_ENV)
+    return Path(env) if env else None
+
+
+def profiled(fn: Callable[P, R]) -> Callable[P, R]:
+    """
+    Profile each call of `fn` when profiling is on.
+
+    When profiling is off the wrapper only checks the setting and calls
+    `fn` directly.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        directory = profile_dir()
+        if directory is None:
+            return fn(*args, **kwargs)
+        return _profile_call(directory, fn, *args, **kwargs)
+
+    return wrapper
+
+
+def _profile_call(
+    directory: Path, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs
+) -> R:
+    """Run `fn` under cProfile and tracemalloc and write the run's profiles."""
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = directory / (
+        f"{fn.__name__}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        f"-{next(_run_counter)}"
+    )
+
+    _start_tracemalloc()
+    profiler = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+    try:
+        before = tracemalloc.take_snapshot()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            after = tracemalloc.take_snapshot()
+            if profiler is not None:
+                profiler.dump_stats(stem.with_suffix(".prof"))
+            _write_allocations(stem.with_suffix(".alloc.json"), before, after)
+    finally:
+        if profiler is not None:
+            _cprofile_lock.release()
+        _stop_tracemalloc()
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned  # noqa: PLW0603
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            _tracemalloc_owned = not tracemalloc.is_tracing()
+            if _tracemalloc_owned:
+                tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users  # noqa: PLW0603
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+
+
+def _write_allocations(
+    path: Path, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+) -> None:
+    """Write the allocation sites that grew between two snapshots."""
+    ignore = [
+        tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)
+    ]
+    diff = after.filter_traces(ignore).compare_to(
+        before.filter_traces(ignore), "lineno"
+    )
+    sites = [
+        {
+            "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size": stat.size_diff,
+            "count": stat.count_diff,
+        }
+        for stat in diff
+        if stat.size_diff > 0
+    ]
+    path.write_text(json.dumps(sites[:ALLOCATION_SITES_PER_RUN]))
+
+
+@dataclass(frozen=True)
+class FunctionStat:
+    """Aggregated cProfile figures of one function."""
+
+    function: str
+    calls: int
+    total_time: float
+    cumulative_time: float
+
+
+@dataclass(frozen=True)
+class AllocationStat:
+    """Aggregated memory growth at one allocation site."""
+
+    site: str
+    size: int
+    count: int
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """
+    Top functions and allocation sites across profiled runs.
+
+    Attributes:
+        runs: Number of profiled runs found.
+        functions: Functions by cumulative time, highest first.
+        allocations: Allocation sites by memory growth, largest first.
+    """
+
+    runs: int
+    functions: list[FunctionStat]
+    allocations: list[AllocationStat]
+
+    def format(self) -> str:
+        """Render the report as plain text."""
+        lines = [f"Profiled runs: {self.runs}", "", "Top functions by cumulative time:"]
+        lines += [
+            f"  {f.cumulative_time:10.3f}s {f.total_time:10.3f}s {f.calls:8d}  {f.function}"
+            for f in self.functions
+        ]
+        lines += ["", "Top allocation sites:"]
+        lines += [
+            f"  {a.size / 1024:10.1f} KiB {a.count:8d}  {a.site}"
+            for a in self.allocations
+        ]
+        return "\n".join(lines)
+
+
+def profile_report(directory: Path, *, top: int = 20) -> ProfileReport:
+    """
+    Aggregate the profiles written to `directory`.
+
+    Args:
+        directory: A profile directory, e.g. that of a whole batch.
+        top: Number of functions and allocation sites to keep.
+
+    Returns:
+        The aggregated `ProfileReport`.
+    """
+    alloc_files = sorted(directory.glob("*.alloc.json"))
+    prof_files = sorted(directory.glob("*.prof"))
+
+    functions: list[FunctionStat] = []
+    if prof_files:
+        stats = pstats.Stats(*map(str, prof_files))
+        for (filename, line, name), row in stats.stats.items():  # type: ignore[attr-defined]
+            _, calls, total, cumulative, _ = row
+            functions.append(
+                FunctionStat(
+                    function=f"{filename}:{line}({name})",
+                    calls=calls,
+                    total_time=total,
+                    cumulative_time=cumulative,
+                )
+            )
+        functions.sort(key=lambda f: f.cumulative_time, reverse=True)
+
+    sizes: dict[str, list[int]] = {}
+    for path in alloc_files:
+        for site in json.loads(path.read_text()):
+            totals = sizes.setdefault(site["site"], [0, 0])
+            totals[0] += site["size"]
+            totals[1] += site["count"]
+    allocations = sorted(
+        (AllocationStat(site, size, count) for site, (size, count) in sizes.items()),
+        key=lambda a: a.size,
+        reverse=True,
+    )
+
+    return ProfileReport(
+        runs=len(alloc_files),
+        functions=functions[:top],
+        allocations=allocations[:top],
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:  # noqa: PLR2004
+        sys.exit(
+            f"usage: python -m {__spec__.name if __spec__ else 'profiling'} DIRECTORY"
+        )
+    print(profile_report(Path(sys.argv[1])).format())  # noqa: T201
@@ -0,0 +1,354 @@
+"""
+Rate limiting and concurrency capping for transcription API calls.
+
+`generate_transcript_task` makes one API call per audio chunk. Real
+transcription backends are rate-limited services, so running many chunks or
+videos in parallel quickly produces 429 responses and wasted retries. This
+module provides a `RateLimiter` combining a token bucket with a concurrency
+cap, which every per-chunk call goes through.
+
+A limiter is shared by all threads of a process. Given a `state_dir`, it is
+also shared by all processes on the host: the token bucket lives in a small
+file guarded by an advisory lock, and each concurrency slot is a lock file
+that the operating system releases if its holder dies.
+
+The limiter used by the tasks is configured with `configure_rate_limiter` or,
+for worker processes, with environment variables:
+
+- ``TWAT_TASK_RATE_LIMIT``: calls per second.
+- ``TWAT_TASK_RATE_BURST``: bucket capacity (defaults to one second of calls).
+- ``TWAT_TASK_MAX_CONCURRENCY``: maximum calls in flight.
+- ``TWAT_TASK_RATE_LIMIT_DIR``: directory holding the shared state.
+
+Without any configuration calls are not limited.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    HAS_FCNTL = False
+else:
+    HAS_FCNTL = True
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# Interval between attempts to grab a concurrency slot held by another process.
+SLOT_POLL_SECONDS = 0.01
+
+_BUCKET_STATE = struct.Struct("<dd")  # tokens, time of the last refill
+
+
+@dataclass(frozen=True)
+class RateLimitMetrics:
+    """
+    Wait-time statistics of a `RateLimiter` in the current process.
+
+    Attributes:
+        calls: Number of calls that went through the limiter.
+        waited_calls: Number of calls that had to wait.
+        total_wait: Total time spent waiting, in seconds.
+        max_wait: Longest single wait, in seconds.
+    """
+
+    calls: int = 0
+    waited_calls: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Mean wait per call, in seconds."""
+        return self.total_wait / self.calls if self.calls else 0.0
+
+
+class RateLimiter:
+    """
+    A token-bucket rate limiter with a concurrency cap.
+
+    Args:
+        rate: Sustained calls per second, or `None` for no rate limit.
+        burst: Bucket capacity, i.e. how many calls may start back to back
+            after an idle period. Defaults to `rate`, and at least 1.
+        max_concurrency: Maximum calls in flight, or `None` for no cap.
+        state_dir: Directory for state shared between processes. Without it
+            the limiter only coordinates threads of the current process.
+
+    Example:
+        >>> limiter = RateLimiter(rate=10, max_concurrency=4)
+        >>> with limiter.acquire():
+        ...     pass  # call the API
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        *,
+        burst: float | None = None,
+        max_concurrency: int | None = None,
+        state_dir: Path | None = None,
+    ) -> None:
+        if rate is not None and rate <= 0:
+            msg = f"Rate must be positive, got {rate}"
+            raise ValueError(msg)
+        if max_concurrency is not None and max_concurrency < 1:
+            msg = f"Concurrency cap must be at least 1, got {max_concurrency}"
+            raise ValueError(msg)
+        if state_dir is not None:
+            if not HAS_FCNTL:  # pragma: no cover - not available on Windows
+                msg = "Sharing a rate limiter between processes requires fcntl"
+                raise RuntimeError(msg)
+            state_dir.mkdir(parents=True, exist_ok=True)
+
+        self.rate = rate
+        self.burst = max(burst if burst is not None else (rate or 1.0), 1.0)
+        self.max_concurrency = max_concurrency
+        self.state_dir = state_dir
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._refilled = time.time()
+        self._slots = (
+            threading.BoundedSemaphore(max_concurrency)
+            if max_concurrency is not None and state_dir is None
+            else None
+        )
+        self._metrics = RateLimitMetrics()
+
+    @property
+    def unlimited(self) -> bool:
+        """Whether the limiter lets every call through immediately."""
+        return self.rate is None and self.max_concurrency is None
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """
+        Wait for a concurrency slot and a token, then hold the slot.
+
+        The slot is released when the block exits, whether or not the call
+        succeeded.
+        """
+        if self.unlimited:
+            self._record(0.0, blocked=False)
+            yield
+            return
+
+        started = time.monotonic()
+        blocked = False
+        with ExitStack() as stack:
+            if self.max_concurrency is not None:
+                blocked |= stack.enter_context(self._concurrency_slot())
+            if self.rate is not None:
+                blocked |= self._take_token()
+            self._record(time.monotonic() - started, blocked=blocked)
+            yield
+
+    @contextmanager
+    def try_acquire(self) -> Iterator[bool]:
+        """
+        Take a concurrency slot and a token only if neither requires waiting.
+
+        Yields whether the call may proceed; the slot, if taken, is held
+        until the block exits. Refused attempts are not counted as calls.
+        """
+        with ExitStack() as stack:
+            acquired = True
+            if self.max_concurrency is not None:
+                acquired = stack.enter_context(self._try_concurrency_slot())
+            if acquired and self.rate is not None:
+                acquired = self._try_take_token() <= 0
+            if acquired:
+                self._record(0.0, blocked=False)
+            yield acquired
+
+    def metrics(self) -> RateLimitMetrics:
+        """Return a snapshot of the wait-time metrics of this process."""
+        with self._lock:
+            return self._metrics
+
+    def _record(self, waited: float, *, blocked: bool) -> None:
+        with self._lock:
+            m = self._metrics
+            self._metrics = RateLimitMetrics(
+                calls=m.calls + 1,
+                waited_calls=m.waited_calls + blocked,
+                total_wait=m.total_wait + waited,
+                max_wait=max(m.max_wait, waited),
+            )
+
+    def _take_token(self) -> bool:
+        """Block until a token is available and consume it; return whether it blocked."""
+        blocked = False
+        while (wait := self._try_take_token()) > 0:
+            blocked = True
+            time.sleep(wait)
+        return blocked
+
+    def _try_take_token(self) -> float:
+        """Take a token if one is available; return how long to wait otherwise."""
+        with self._lock:
+            if self.state_dir is None:
+                self._tokens, self._refilled, wait = self._refill(
+                    self._tokens, self._refilled
+                )
+                return wait
+            return self._take_shared_token()
+
+    def _refill(self, tokens: float, refilled: float) -> tuple[float, float, float]:
+        """
+        Refill the bucket and try to take a token.
+
+        Returns:
+            The new `(tokens, refilled)` state and how long to wait before
+            retrying, which is zero if a token was taken.
+        """
+        if self.rate is None:
+            msg = "Refilling requires a rate"
+            raise RuntimeError(msg)
+        now = time.time()
+        tokens = min(self.burst, tokens + max(now - refilled, 0.0) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0.0
+        return tokens, now, (1 - tokens) / self.rate
+
+    def _take_shared_token(self) -> float:
+        """Run `_refill` on the bucket stored in `state_dir`."""
+        if self.state_dir is None:
+            msg = "Shared tokens require a state directory"
+            raise RuntimeError(msg)
+        path = self.state_dir / "bucket"
+        with path.open("a+b") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            handle.seek(0)
+            raw = handle.read(_BUCKET_STATE.size)
+            if len(raw) == _BUCKET_STATE.size:
+                tokens, refilled = _BUCKET_STATE.unpack(raw)
+            else:
+                tokens, refilled = self.burst, time.time()
+            tokens, refilled, wait = self._refill(tokens, refilled)
+            handle.seek(0)
+            handle.truncate()
+            handle.write(_BUCKET_STATE.pack(tokens, refilled))
+            handle.flush()
+        return wait
+
+    @contextmanager
+    def _concurrency_slot(self) -> Iterator[bool]:
+        """Hold a concurrency slot, yielding whether getting it blocked."""
+        if self._slots is not None:
+            blocked = not self._slots.acquire(blocking=False)
+            if blocked:
+                self._slots.acquire()
+            try:
+                yield blocked
+            finally:
+                self._slots.release()
+            return
+        handle, blocked = self._grab_slot_file()
+        try:
+            yield blocked
+        finally:
+            handle.close()  # Closing the file releases its lock
+
+    @contextmanager
+    def _try_concurrency_slot(self) -> Iterator[bool]:
+        """Hold a concurrency slot if one is free, yielding whether it was."""
+        if self._slots is not None:
+            acquired = self._slots.acquire(blocking=False)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    self._slots.release()
+            return
+        handle = self._try_slot_file()
+        try:
+            yield handle is not None
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def _grab_slot_file(self) -> tuple[IO[bytes], bool]:
+        """Lock one of the slot files in `state_dir`, polling until one is free."""
+        blocked = False
+        while (handle := self._try_slot_file()) is None:
+            blocked = True
+            time.sleep(SLOT_POLL_SECONDS)
+        return handle, blocked
+
+    def _try_slot_file(self) -> IO[bytes] | None:
+        """Lock a free slot file in `state_dir`, or return `None` if all are held."""
+        if self.state_dir is None or self.max_concurrency is None:
+            msg = "Shared slots require a state directory and a concurrency cap"
+            raise RuntimeError(msg)
+        for i in range(self.max_concurrency):
+            handle = (self.state_dir / f"slot-{i}.lock").open("a+b")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            return handle
+        return None
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def configure_rate_limiter(
+    rate: float | None = None,
+    *,
+    burst: float | None = None,
+    max_concurrency: int | None = None,
+    state_dir: Path | None = None,
+) -> RateLimiter:
+    """
+    Set the limiter used by the transcription tasks of this process.
+
+    Calling it without arguments removes all limits. See `RateLimiter` for
+    the meaning of the arguments.
+
+    Returns:
+        The new limiter, whose `metrics()` report the tasks' wait times.
+    """
+    global _limiter  # noqa: PLW0603
+    with _limiter_lock:
+        _limiter = RateLimiter(
+            rate, burst=burst, max_concurrency=max_concurrency, state_dir=state_dir
+        )
+        return _limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the limiter used by the transcription tasks of this process.
+
+    On first use the limiter is built from the ``TWAT_TASK_*`` environment
+    variables described in the module documentation.
+    """
+    global _limiter  # noqa: PLW0603
+    with _limiter_lock:
+        if _limiter is None:
+            rate = os.environ.get("TWAT_TASK_RATE_LIMIT")
+            burst = os.environ.get("TWAT_TASK_RATE_BURST")
+            concurrency = os.environ.get("TWAT_TASK_MAX_CONCURRENCY")
+            state_dir = os.environ.get("TWAT_TASK_RATE_LIMIT_DIR")
+            _limiter = RateLimiter(
+                float(rate) if rate else None,
+                burst=float(burst) if burst else None,
+                max_concurrency=int(concurrency) if concurrency else None,
+                state_dir=Path(state_dir) if state_dir else None,
+            )
+        return _limiter
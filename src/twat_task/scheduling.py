@@ -0,0 +1,257 @@
+"""
+Duration-aware scheduling of batch runs.
+
+By default videos are processed in submission order, so a single long video
+at the head of a batch delays every short one behind it. This module orders
+a batch using cheaply probed durations before running it:
+
+- ``"fifo"``: submission order.
+- ``"sjf"``: shortest job first, which minimises mean completion time.
+- ``"deadline"``: earliest deadline first; videos without a deadline run
+  afterwards, shortest first.
+- ``"priority"``: weighted shortest job first, ordering by estimated
+  processing time divided by priority.
+
+Example:
+    >>> from pathlib import Path
+    >>> from twat_task.scheduling import run_batch
+    >>> videos = sorted(Path("inbox").glob("*.mp4"))
+    >>> results = run_batch(videos, policy="sjf", max_workers=4)  # doctest: +SKIP
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from twat_task.capacity import MAX_MOCK_DURATION, MIN_MOCK_DURATION, CostModel
+from twat_task.task import process_video_flow
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+    from pathlib import Path
+
+    from twat_task.sinks import ResultSink
+
+Policy = Literal["fifo", "sjf", "deadline", "priority"]
+POLICIES: tuple[Policy, ...] = ("fifo", "sjf", "deadline", "priority")
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """
+    A video queued for a batch run.
+
+    Attributes:
+        video_path: The path to the input video file.
+        index: Position of the video in the submitted batch.
+        duration: Probed audio duration in seconds, or `None` if unknown.
+        deadline: Target completion time in seconds from the start of the
+            batch, or `None` if the video has no deadline.
+        priority: Relative importance; higher values run earlier under the
+            ``"priority"`` policy.
+    """
+
+    video_path: Path
+    index: int = 0
+    duration: int | None = None
+    deadline: float | None = None
+    priority: float = 1.0
+
+
+def probe_duration(video_path: Path) -> int | None:
+    """
+    Probe the audio duration of a video without processing it.
+
+    The duration is read from the metadata that `extract_audio_task` writes
+    next to the video. A real implementation would ask a container probe
+    such as ``ffprobe`` instead, which only reads the file header.
+
+    Args:
+        video_path: The path to the input video file.
+
+    Returns:
+        The duration in seconds, or `None` if it cannot be determined cheaply.
+    """
+    audio = video_path.with_suffix(".mp3")
+    try:
+        duration = json.loads(audio.read_text()).get("duration")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return duration if isinstance(duration, int) else None
+
+
+def schedule(
+    jobs: Iterable[BatchJob],
+    policy: Policy = "sjf",
+    *,
+    cost_model: CostModel | None = None,
+) -> list[BatchJob]:
+    """
+    Order a batch according to a scheduling policy.
+
+    Jobs with an unknown duration are assumed to be as long as the median of
+    the known durations in the batch. Ties keep submission order.
+
+    Args:
+        jobs: The jobs to order.
+        policy: One of `POLICIES`.
+        cost_model: Used to turn durations into processing time estimates.
+
+    Returns:
+        The jobs in the order they should be started.
+
+    Raises:
+        ValueError: If the policy is unknown or a priority is not positive.
+    """
+    batch = list(jobs)
+    return sorted(batch, key=_sort_key(batch, policy, cost_model or CostModel()))
+
+
+def _sort_key(
+    batch: Sequence[BatchJob], policy: str, cost_model: CostModel
+) -> Callable[[BatchJob], tuple[float, ...]]:
+    """Build the sort key implementing `policy` for `batch`."""
+    known = [job.duration for job in batch if job.duration is not None]
+    fallback = (
+        int(statistics.median(known))
+        if known
+        else (MIN_MOCK_DURATION + MAX_MOCK_DURATION) // 2
+    )
+
+    def estimate(job: BatchJob) -> float:
+        duration = job.duration if job.duration is not None else fallback
+        return cost_model.service_time(duration)
+
+    if policy == "fifo":
+        return lambda job: (job.index,)
+    if policy == "sjf":
+        return lambda job: (estimate(job), job.index)
+    if policy == "deadline":
+        return lambda job: (
+            job.deadline is None,
+            job.deadline or 0.0,
+            estimate(job),
+            job.index,
+        )
+    if policy == "priority":
+        if any(job.priority <= 0 for job in batch):
+            msg = "Priorities must be positive"
+            raise ValueError(msg)
+        return lambda job: (estimate(job) / job.priority, job.index)
+    msg = f"Unknown scheduling policy {policy!r}, expected one of {POLICIES}"
+    raise ValueError(msg)
+
+
+def run_batch(  # noqa: PLR0913
+    video_paths: Sequence[Path],
+    *,
+    policy: Policy = "sjf",
+    deadlines: Mapping[Path, float] | None = None,
+    priorities: Mapping[Path, float] | None = None,
+    max_workers: int = 1,
+    sink: ResultSink | None = None,
+) -> list[tuple[Path, str]]:
+    """
+    Process a batch of videos with `process_video_flow` in scheduled order.
+
+    Args:
+        video_paths: The videos to process, in submission order.
+        policy: One of `POLICIES`.
+        deadlines: Optional deadline per video, in seconds from the start.
+        priorities: Optional priority per video; defaults to 1.
+        max_workers: Number of videos processed concurrently.
+        sink: Optional `twat_task.sinks.ResultSink`. Each result is written
+            to it as soon as its video finishes instead of being collected,
+            and videos the sink already holds are skipped.
+
+    Returns:
+        The `(audio_path, transcript)` result of each video, in submission
+        order regardless of the order they were processed in. Empty when
+        results go to a `sink`.
+
+    Raises:
+        BatchError: If a `sink` is given and some videos failed; the other
+            results are written first.
+    """
+    deadlines = deadlines or {}
+    priorities = priorities or {}
+    jobs = [
+        BatchJob(
+            video_path=path,
+            index=index,
+            duration=probe_duration(path),
+            deadline=deadlines.get(path),
+            priority=priorities.get(path, 1.0),
+        )
+        for index, path in enumerate(video_paths)
+        if sink is None or path not in sink
+    ]
+    ordered = schedule(jobs, policy)
+    if sink is not None:
+        _run_into_sink(ordered, sink, max_workers)
+        return []
+
+    # The executor starts submitted work in submission order.
+    with ThreadPoolExecutor(max_workers) as pool:
+        futures = {
+            job.index: pool.submit(process_video_flow, job.video_path)
+            for job in ordered
+        }
+        return [futures[index].result() for index in range(len(jobs))]
+
+
+def _run_into_sink(
+    jobs: Sequence[BatchJob], sink: ResultSink, max_workers: int
+) -> None:
+    """
+    Process jobs in the given order, writing each result as it finishes.
+
+    A failing video does not stop the batch; failures are raised together
+    once every other result is written.
+    """
+    failures: dict[Path, BaseException] = {}
+    with ThreadPoolExecutor(max_workers) as pool:
+        pending = {
+            pool.submit(process_video_flow, job.video_path): job.video_path
+            for job in jobs
+        }
+        while pending:
+            done, _ = wait(
+                pending, timeout=sink.flush_seconds, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                sink.flush()  # Nothing finished for a while; persist what we have
+                continue
+            for future in done:
+                # Drop finished futures so results are not held until the end
+                video_path = pending.pop(future)
+                try:
+                    audio_path, transcript = future.result()
+                except Exception as exc:  # noqa: BLE001 - raised after the batch
+                    failures[video_path] = exc
+                else:
+                    sink.write(video_path, audio_path, transcript)
+    sink.flush()
+    if failures:
+        raise BatchError(failures)
+
+
+class BatchError(Exception):
+    """
+    Raised by `run_batch` with a sink when some videos failed.
+
+    The results of all other videos were written to the sink.
+
+    Attributes:
+        failures: The error of each failed video.
+    """
+
+    def __init__(self, failures: dict[Path, BaseException]) -> None:
+        self.failures = failures
+        first, error = next(iter(failures.items()))
+        msg = f"{len(failures)} video(s) failed, first {first}: {error!r}"
+        super().__init__(msg)
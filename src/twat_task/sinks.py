@@ -0,0 +1,258 @@
+"""
+Incremental export of batch results.
+
+A sink receives each video's result as soon as it finishes, so a batch never
+holds all transcripts in memory, and a crash loses at most the records
+written since the last flush. Sinks remember which videos they already
+hold; a rerun of the same batch into the same sink skips them.
+
+- `JsonlSink` appends one JSON object per line to a single file.
+- `ParquetSink` writes columnar Parquet part files to a directory. It needs
+  the optional ``pyarrow`` dependency (``pip install twat-task[parquet]``).
+
+Every record has the fields ``video_path``, ``audio_path`` and
+``transcript``; ``video_path`` identifies the record.
+
+Example:
+    >>> from pathlib import Path
+    >>> from twat_task.scheduling import run_batch
+    >>> from twat_task.sinks import JsonlSink
+    >>> videos = sorted(Path("inbox").glob("*.mp4"))
+    >>> with JsonlSink(Path("results.jsonl")) as sink:  # doctest: +SKIP
+    ...     run_batch(videos, max_workers=4, sink=sink)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from typing_extensions import Self
+
+FIELDS = ("video_path", "audio_path", "transcript")
+
+
+class ResultSink(ABC):
+    """
+    Base class of result sinks.
+
+    Subclasses implement `_load_keys`, `_append` and `_flush`; this class
+    handles resuming, locking and the flush schedule.
+
+    Args:
+        flush_every: Records after which buffered output is flushed and
+            synced to disk.
+        flush_seconds: Seconds after which buffered output is flushed, even
+            if fewer than `flush_every` records were written. It is checked
+            when a record is written, so records written just before the
+            batch stalls stay buffered until the next `write`, `flush` or
+            `close`. `run_batch` calls `flush` whenever no video finished
+            for this long.
+    """
+
+    def __init__(self, *, flush_every: int = 100, flush_seconds: float = 5.0) -> None:
+        if flush_every < 1:
+            msg = f"flush_every must be at least 1, got {flush_every}"
+            raise ValueError(msg)
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._keys = self._load_keys()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __contains__(self, video_path: object) -> bool:
+        """Return whether the sink already holds a record for `video_path`."""
+        return str(video_path) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def write(self, video_path: Path, audio_path: Path, transcript: str) -> bool:
+        """
+        Add the result of one video.
+
+        Returns:
+            `False` if the sink already held a record for the video; the
+            new result is then dropped.
+        """
+        record = {
+            "video_path": str(video_path),
+            "audio_path": str(audio_path),
+            "transcript": transcript,
+        }
+        with self._lock:
+            if record["video_path"] in self._keys:
+                return False
+            self._append(record)
+            self._keys.add(record["video_path"])
+            self._unflushed += 1
+            if (
+                self._unflushed >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            ):
+                self._flush_locked()
+        return True
+
+    def flush(self) -> None:
+        """Write buffered records and sync them to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush and release the sink."""
+        self.flush()
+
+    def _flush_locked(self) -> None:
+        self._flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def _load_keys(self) -> set[str]:
+        """Return the keys of the records already stored."""
+
+    @abstractmethod
+    def _append(self, record: dict[str, str]) -> None:
+        """Buffer one record."""
+
+    @abstractmethod
+    def _flush(self) -> None:
+        """Make buffered records durable."""
+
+
+class JsonlSink(ResultSink):
+    """
+    Append records to a JSON Lines file.
+
+    A line cut short by a crash is removed on open, so appends after a
+    resume start on a clean line.
+
+    Args:
+        path: The JSONL file; created if missing.
+        flush_every: See `ResultSink`.
+        flush_seconds: See `ResultSink`.
+    """
+
+    def __init__(
+        self, path: Path, *, flush_every: int = 100, flush_seconds: float = 5.0
+    ) -> None:
+        self.path = path
+        super().__init__(flush_every=flush_every, flush_seconds=flush_seconds)
+        self._handle = self.path.open("a", encoding="utf-8")
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        with self._lock:
+            if self._handle.closed:
+                return
+            self._flush_locked()
+            self._handle.close()
+
+    def _load_keys(self) -> set[str]:
+        keys: set[str] = set()
+        if not self.path.exists():
+            return keys
+        end = 0  # Offset just past the last complete line
+        with self.path.open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                end += len(line)
+                try:
+                    keys.add(json.loads(line)["video_path"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        if end != self.path.stat().st_size:
+            os.truncate(self.path, end)
+        return keys
+
+    def _append(self, record: dict[str, str]) -> None:
+        self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _flush(self) -> None:
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+
+class ParquetSink(ResultSink):
+    """
+    Write records as Parquet part files to a directory.
+
+    Records are buffered in memory and written as a new part file on each
+    flush, so memory stays bounded by `flush_every` records. Part files are
+    written to a temporary name and renamed, so a crash never leaves a
+    partial part behind.
+
+    Args:
+        directory: Directory of the part files; created if missing.
+        flush_every: Rows per part file; see `ResultSink`.
+        flush_seconds: See `ResultSink`.
+
+    Raises:
+        ImportError: If ``pyarrow`` is not installed.
+    """
+
+    def __init__(
+        self, directory: Path, *, flush_every: int = 1000, flush_seconds: float = 60.0
+    ) -> None:
+        try:
+            import pyarrow as pa  # type: ignore[import-not-found,import-untyped,unused-ignore]  # noqa: PLC0415
+            import pyarrow.parquet as pq  # type: ignore[import-not-found,import-untyped,unused-ignore]  # noqa: PLC0415
+        except ImportError:
+            msg = "ParquetSink requires pyarrow; install twat-task[parquet]"
+            raise ImportError(msg) from None
+        self._pa: Any = pa
+        self._pq: Any = pq
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._rows: list[dict[str, str]] = []
+        super().__init__(flush_every=flush_every, flush_seconds=flush_seconds)
+
+    def _parts(self) -> list[Path]:
+        return sorted(self.directory.glob("part-*.parquet"))
+
+    def _load_keys(self) -> set[str]:
+        keys: set[str] = set()
+        for part in self._parts():
+            table = self._pq.read_table(part, columns=["video_path"])
+            keys.update(table.column("video_path").to_pylist())
+        return keys
+
+    def _append(self, record: dict[str, str]) -> None:
+        self._rows.append(record)
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        parts = self._parts()
+        number = int(parts[-1].stem.removeprefix("part-")) + 1 if parts else 0
+        path = self.directory / f"part-{number:05d}.parquet"
+        tmp = path.with_suffix(".parquet.tmp")
+        table = self._pa.table(
+            {field: [row[field] for row in self._rows] for field in FIELDS}
+        )
+        self._pq.write_table(table, tmp)
+        with tmp.open("rb") as handle:
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+        self._rows.clear()
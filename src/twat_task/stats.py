@@ -0,0 +1,39 @@
+"""
+Small statistics helpers shared by the capacity simulator and the hedger.
+
+This module has no dependencies on the rest of the package, so it can be
+imported from the per-chunk transcription path without pulling in the
+simulator or the Prefect tasks.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Return the `q`-th percentile of `values` using linear interpolation.
+
+    Args:
+        values: Sample values, in any order.
+        q: Percentile between 0 and 100.
+
+    Raises:
+        ValueError: If `values` is empty or `q` is out of range.
+    """
+    if not values:
+        msg = "percentile() requires at least one value"
+        raise ValueError(msg)
+    if not 0 <= q <= 100:  # noqa: PLR2004
+        msg = f"Percentile must be between 0 and 100, got {q}"
+        raise ValueError(msg)
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
@@ -0,0 +1,151 @@
+"""
+Timed transcript segments and the artifacts rendered from them.
+
+`generate_transcript_task` produces one `Segment` per transcribed chunk.
+Every extra output format is rendered from that segment list, so asking for
+subtitles or a segment file costs formatting time only, not another pass
+over the audio.
+
+Supported artifact kinds, written next to the audio file:
+
+- ``"txt"``: the plain transcript text (``<audio>.txt``).
+- ``"segments"``: the segment list as JSON (``<audio>.segments.json``).
+- ``"srt"``: SubRip subtitles (``<audio>.srt``).
+- ``"vtt"``: WebVTT subtitles (``<audio>.vtt``).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from pathlib import Path
+
+ARTIFACT_SUFFIXES = {
+    "txt": ".txt",
+    "segments": ".segments.json",
+    "srt": ".srt",
+    "vtt": ".vtt",
+}
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    A piece of transcript with its position in the audio.
+
+    Attributes:
+        start: Start time in seconds.
+        end: End time in seconds.
+        text: The transcribed text.
+    """
+
+    start: float
+    end: float
+    text: str
+
+
+def check_artifact_kinds(kinds: Iterable[str]) -> tuple[str, ...]:
+    """
+    Return the requested artifact kinds without duplicates, in order.
+
+    Call it before transcribing, so an unknown kind fails before any work.
+
+    Raises:
+        ValueError: If a kind is not one of `ARTIFACT_SUFFIXES`.
+    """
+    unique = tuple(dict.fromkeys(kinds))
+    for kind in unique:
+        if kind not in ARTIFACT_SUFFIXES:
+            msg = f"Unknown artifact kind {kind!r}, expected one of {sorted(ARTIFACT_SUFFIXES)}"
+            raise ValueError(msg)
+    return unique
+
+
+def artifact_path(audio_path: Path, kind: str) -> Path:
+    """
+    Return where an artifact of the given kind is written for `audio_path`.
+
+    Raises:
+        ValueError: If `kind` is not one of `ARTIFACT_SUFFIXES`.
+    """
+    check_artifact_kinds([kind])
+    return audio_path.with_suffix(ARTIFACT_SUFFIXES[kind])
+
+
+def render_text(segments: Iterable[Segment]) -> str:
+    """Join the text of all segments into the plain transcript."""
+    return " ".join(segment.text for segment in segments)
+
+
+def render_segments(segments: Iterable[Segment]) -> str:
+    """Render segments as a JSON list of ``{"start", "end", "text"}`` objects."""
+    return json.dumps([asdict(segment) for segment in segments], indent=2)
+
+
+def render_srt(segments: Iterable[Segment]) -> str:
+    """Render segments as SubRip (``.srt``) subtitles."""
+    cues = [
+        f"{number}\n{_timestamp(s.start, ',')} --> {_timestamp(s.end, ',')}\n{s.text}\n"
+        for number, s in enumerate(segments, start=1)
+    ]
+    return "\n".join(cues)
+
+
+def render_vtt(segments: Iterable[Segment]) -> str:
+    """Render segments as WebVTT (``.vtt``) subtitles."""
+    cues = [
+        f"{_timestamp(s.start, '.')} --> {_timestamp(s.end, '.')}\n{s.text}\n"
+        for s in segments
+    ]
+    return "\n".join(["WEBVTT\n", *cues])
+
+
+_RENDERERS: dict[str, Callable[[Sequence[Segment]], str]] = {
+    "txt": render_text,
+    "segments": render_segments,
+    "srt": render_srt,
+    "vtt": render_vtt,
+}
+
+
+def write_artifacts(
+    audio_path: Path, segments: Sequence[Segment], kinds: Iterable[str]
+) -> dict[str, Path]:
+    """
+    Render and write the requested artifacts for a transcribed audio file.
+
+    Args:
+        audio_path: The audio file the segments were transcribed from.
+        segments: The timed segments, in order.
+        kinds: Artifact kinds to write; see `ARTIFACT_SUFFIXES`.
+
+    Returns:
+        The path written for each kind.
+
+    Raises:
+        ValueError: If a kind is unknown; nothing is written then.
+    """
+    written = {}
+    for kind in check_artifact_kinds(kinds):
+        path = artifact_path(audio_path, kind)
+        path.write_text(_RENDERERS[kind](segments))
+        written[kind] = path
+    return written
+
+
+def load_segments(path: Path) -> list[Segment]:
+    """Read a segment list written as a ``"segments"`` artifact."""
+    return [Segment(**item) for item in json.loads(path.read_text())]
+
+
+def _timestamp(seconds: float, decimal_mark: str) -> str:
+    """Format seconds as ``HH:MM:SS`` plus milliseconds after `decimal_mark`."""
+    millis = round(seconds * 1000)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_mark}{millis:03d}"
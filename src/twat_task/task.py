@@ -9,21 +9,71 @@ for a high-level interface to video processing.
 from __future__ import annotations
 
 import json # PLC0415: Moved to top level
+import threading
 import time # PLC0415: Moved to top level
-from functools import cached_property
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache, cached_property, partial
 from pathlib import Path
 from random import choice, randint # PLC0415: Moved to top level, S311: random is fine for mock data
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, ClassVar, Literal
+from weakref import WeakValueDictionary
 
 from prefect import flow, task
-from pydantic import BaseModel, computed_field
+from pydantic import (
+    BaseModel,
+    PrivateAttr,
+    TypeAdapter,
+    computed_field,
+    model_validator,
+)
+
+from twat_task.caching import (
+    FileContentInputs,
+    TranscriptInputs,
+    cache_expiration,
+    task_cache_options,
+)
+from twat_task.chunks import (
+    AudioChunkReader,
+    ChunkCache,
+    check_time_range,
+    chunk_range,
+)
+from twat_task.hedging import get_hedger
+from twat_task.profiling import profiled
+from twat_task.ratelimit import get_rate_limiter
+from twat_task.subtitles import (
+    Segment,
+    check_artifact_kinds,
+    render_text,
+    write_artifacts,
+)
 
 if TYPE_CHECKING:
-    from pathlib import Path
-
-
-@task(retries=2)
-def extract_audio_task(video_path: Path, audio_path: Path) -> None:
+    from collections.abc import Callable, Iterable, Sequence
+
+    from typing_extensions import Self
+
+# Cost model of the mock tasks. These constants are the single source of truth
+# for the simulated delays below and for the capacity simulator in
+# `twat_task.capacity`.
+EXTRACT_SETUP_SECONDS = 2.0  # Initial metadata fetch in `extract_audio_task`
+EXTRACT_STEP_SECONDS = 0.5  # Duration of one extraction processing step
+EXTRACT_STEPS = 10  # Number of extraction processing steps
+TRANSCRIBE_SETUP_SECONDS = 1.5  # Fixed overhead of `generate_transcript_task`
+CHUNK_SECONDS = 30  # Length of one transcription chunk, in seconds of audio
+CHUNK_CALL_SECONDS = 0.3  # Simulated API call per transcription chunk
+
+
+# Cache keys hash the input file content and the other parameters, plus the
+# task source so that code changes invalidate old results. See
+# `twat_task.caching` for expiration and result storage settings.
+@task(
+    retries=2,
+    **task_cache_options(FileContentInputs(files=("video_path",))),
+)
+@profiled
+def extract_audio_task(video_path: Path, audio_path: Path) -> dict[str, Any]:
     """
     Extract audio from a video file.
 
@@ -34,6 +84,10 @@ def extract_audio_task(video_path: Path, audio_path: Path) -> None:
         video_path: Path to the input video file.
         audio_path: Path where the extracted audio should be saved.
 
+    Returns:
+        The metadata written to `audio_path`. A cached run returns it
+        without writing the file; `process_video_flow` writes it then.
+
     Note:
         This is currently a mock implementation for demonstration purposes.
         It simulates a delay and creates a text file with mock metadata
@@ -43,7 +97,7 @@ def extract_audio_task(video_path: Path, audio_path: Path) -> None:
     # Simulate fetching video metadata as JSON
     # Imports moved to top level
 
-    time.sleep(2)  # Simulate API call
+    time.sleep(EXTRACT_SETUP_SECONDS)  # Simulate API call
 
     metadata = {
         "duration": randint(60, 3600),  # nosec B311: random is fine for mock data
@@ -57,15 +111,22 @@ def extract_audio_task(video_path: Path, audio_path: Path) -> None:
     if not isinstance(duration_val, int): # mypy check
         raise TypeError("Duration should be an int")
     duration_val // 10 # Original logic, now with type safety for mypy
-    for _i in range(10):
-        time.sleep(0.5)  # Simulate processing time
+    for _i in range(EXTRACT_STEPS):
+        time.sleep(EXTRACT_STEP_SECONDS)  # Simulate processing time
 
     # Save simulated audio and metadata
     audio_path.write_text(json.dumps(metadata))
+    return metadata
 
 
-@task(retries=2)
-def generate_transcript_task(audio_path: Path) -> str:
+@task(retries=2, **task_cache_options(TranscriptInputs()))
+@profiled
+def generate_transcript_task(
+    audio_path: Path,
+    artifacts: Sequence[str] = (),
+    start: float | None = None,
+    end: float | None = None,
+) -> str:
     """
     Generate transcript from an audio file.
 
@@ -75,62 +136,113 @@ def generate_transcript_task(audio_path: Path) -> str:
 
     Args:
         audio_path: Path to the input audio file.
+        artifacts: Extra outputs to write next to the audio file, rendered
+            from the same pass over the chunks: ``"txt"``, ``"segments"``,
+            ``"srt"`` and/or ``"vtt"``. See `twat_task.subtitles`.
+        start: Start of the time range to transcribe, in seconds. Defaults
+            to the beginning of the audio.
+        end: End of the time range to transcribe, in seconds. Defaults to
+            the end of the audio.
 
     Returns:
-        The generated transcript text.
+        The transcript text of the chunks overlapping the requested range.
 
     Note:
         This is currently a mock implementation for demonstration purposes.
         It simulates reading metadata from the audio file (which itself is
-        a mock) and generating random text.
+        a mock) and generating random text. Each chunk call receives its
+        bytes as a `memoryview` of a memory-mapped audio file
+        (`twat_task.chunks.AudioChunkReader`). Per-chunk calls are throttled
+        by the limiter from `twat_task.ratelimit.get_rate_limiter`, straggling
+        calls are hedged by `twat_task.hedging.get_hedger` if configured, and
+        per-chunk results are cached next to the audio file, so repeated
+        range queries only transcribe chunks not seen before. Cached chunks
+        expire after ``TWAT_TASK_CACHE_EXPIRATION`` like the task cache.
+
+    Raises:
+        ValueError: If an artifact kind is unknown or
+            ``TWAT_TASK_CACHE_EXPIRATION`` is invalid, before any chunk is
+            transcribed.
     """
     # Imports moved to top level
-
-    # Simulate loading audio metadata
-    loaded_metadata = json.loads(audio_path.read_text()) # Renamed to avoid conflict with outer scope 'metadata'
-
-    time.sleep(1.5)
-
-    # Simulate processing chunks with progress
-    duration = loaded_metadata.get("duration")
-    if not isinstance(duration, int): # mypy check
-        # Fallback or error for missing/invalid duration
-        duration = 60 # Default to 60 seconds if not found or invalid
-        # Or raise TypeError(f"Duration {duration} should be an int or is missing")
-
-    chunk_size = 30  # Process in 30-second chunks
-    chunks = duration // chunk_size
-
-
-    words = [
-        "hello",
-        "world",
-        "this",
-        "is",
-        "a",
-        "test",
-        "video",
-        "with",
-        "some",
-        "random",
-        "words",
-        "being",
-        "processed",
-    ]
-
-    transcript_parts = []
-    for _i in range(chunks):
-        time.sleep(0.3)  # Simulate API call and processing
-        # Generate some random text
-        # nosec B311: random is fine for mock data
-        chunk_text = " ".join(choice(words) for _ in range(randint(5, 15)))
-        transcript_parts.append(chunk_text)
-
-    return " ".join(transcript_parts)
+    artifacts = check_artifact_kinds(artifacts)
+    max_age = cache_expiration()
+
+    # Chunks are zero-copy views into a shared, read-only memory map
+    with AudioChunkReader(audio_path) as reader:
+        # Simulate loading audio metadata
+        loaded_metadata = reader.metadata
+
+        time.sleep(TRANSCRIBE_SETUP_SECONDS)
+
+        # Simulate processing chunks with progress
+        duration = loaded_metadata.get("duration")
+        if not isinstance(duration, int): # mypy check
+            # Fallback or error for missing/invalid duration
+            duration = 60 # Default to 60 seconds if not found or invalid
+            # Or raise TypeError(f"Duration {duration} should be an int or is missing")
+
+        # Process in 30-second chunks, only those overlapping the range
+        chunks = chunk_range(duration, CHUNK_SECONDS, start, end)
+
+
+        words = [
+            "hello",
+            "world",
+            "this",
+            "is",
+            "a",
+            "test",
+            "video",
+            "with",
+            "some",
+            "random",
+            "words",
+            "being",
+            "processed",
+        ]
+
+        limiter = get_rate_limiter()
+        hedger = get_hedger()
+
+        def transcribe_chunk(index: int) -> str:
+            with reader.chunk(index, CHUNK_SECONDS) as _data:
+                time.sleep(CHUNK_CALL_SECONDS)  # Simulate API call and processing
+                # Generate some random text
+                # nosec B311: random is fine for mock data
+                return " ".join(choice(words) for _ in range(randint(5, 15)))
+
+        cache = ChunkCache(audio_path, max_age=max_age)
+        segments = []
+        for i in chunks:
+            chunk_text = cache.get(i)
+            if chunk_text is None:
+                # Stragglers may be hedged with a second attempt; each attempt
+                # is a separate API call through the shared rate limiter
+                chunk_text = cache.put(
+                    i, hedger.call(partial(transcribe_chunk, i), limiter=limiter)
+                )
+            segments.append(
+                Segment(
+                    start=i * CHUNK_SECONDS,
+                    end=(i + 1) * CHUNK_SECONDS,
+                    text=chunk_text,
+                )
+            )
+
+        cache.save()
+    # All artifacts are rendered from the same segments; no second pass
+    write_artifacts(audio_path, segments, artifacts)
+    return render_text(segments)
 
 
 @flow
-def process_video_flow(video_path: Path) -> tuple[Path, str]:
+def process_video_flow(
+    video_path: Path,
+    artifacts: Sequence[str] = (),
+    start: float | None = None,
+    end: float | None = None,
+) -> tuple[Path, str]:
     """
     Process a video file to extract audio and generate its transcript.
 
@@ -140,17 +252,72 @@ def process_video_flow(video_path: Path) -> tuple[Path, str]:
 
     Args:
         video_path: Path to the input video file.
+        artifacts: Extra transcript outputs written next to the audio file,
+            e.g. ``("segments", "srt", "vtt")``. They come from the same
+            transcription pass as the returned text.
+        start: Start of the time range to transcribe, in seconds.
+        end: End of the time range to transcribe, in seconds. Audio is
+            always extracted in full; only transcription is limited.
 
     Returns:
         A tuple containing:
             - `audio_path` (Path): Path to the extracted (mock) audio file.
             - `transcript` (str): The generated (mock) transcript text.
+
+    Raises:
+        ValueError: If an artifact kind is unknown, before any task runs.
     """
+    return process_video(
+        video_path,
+        artifacts,
+        start,
+        end,
+        extract=extract_audio_task,
+        transcribe=generate_transcript_task,
+    )
+
+
+def process_video(  # noqa: PLR0913
+    video_path: Path,
+    artifacts: Sequence[str] = (),
+    start: float | None = None,
+    end: float | None = None,
+    *,
+    extract: Callable[[Path, Path], Any],
+    transcribe: Callable[..., str],
+) -> tuple[Path, str]:
+    """
+    Process a video with the given task callables.
+
+    This is the body of `process_video_flow`, which passes the Prefect
+    tasks; `twat_task.workqueue` passes their plain functions to run
+    without a Prefect server. See `process_video_flow` for the arguments.
+
+    Args:
+        video_path: Path to the input video file.
+        artifacts: Extra transcript outputs written next to the audio file.
+        start: Start of the time range to transcribe, in seconds.
+        end: End of the time range to transcribe, in seconds.
+        extract: Called as ``extract(video_path, audio_path)`` if the audio
+            file does not exist yet.
+        transcribe: Called as ``transcribe(audio_path, artifacts=...,
+            start=..., end=...)``.
+
+    Returns:
+        The `(audio_path, transcript)` tuple.
+
+    Raises:
+        ValueError: If an artifact kind is unknown, before anything runs.
+    """
+    artifacts = check_artifact_kinds(artifacts)
     audio = video_path.with_suffix(".mp3")
     # Only extract audio if the file does not exist
     if not audio.exists():
-        extract_audio_task(video_path, audio)
-    transcript = generate_transcript_task(audio)
+        metadata = extract(video_path, audio)
+        # A cache hit returns the metadata without running the task body
+        if isinstance(metadata, dict) and not audio.exists():
+            audio.write_text(json.dumps(metadata))
+    transcript = transcribe(audio, artifacts=artifacts, start=start, end=end)
     return audio, transcript
 
 
@@ -163,8 +330,19 @@ class VideoTranscript(BaseModel):
     Prefect flows when the `audio_path` or `text_transcript` attributes
     are accessed for the first time. Results are cached for subsequent access.
 
+    Use `for_path` or `many` instead of the constructor to get one shared
+    instance per video file, and with it one shared cache. Use `dump_many`
+    or `dump_many_json` to serialize collections without running the flow
+    once per instance during serialization. Use `start` or `prefetch` to
+    process videos in the background; attribute access then waits for the
+    background run instead of starting a new one.
+
     Attributes:
         video_path: The path to the input video file.
+        start_time: Start of the time range to transcribe, in seconds, or
+            `None` for the beginning of the video.
+        end_time: End of the time range to transcribe, in seconds, or `None`
+            for the end of the video.
         audio_path: Path to the extracted audio file. This is a computed
             property. Accessing it will trigger the video processing flow
             if it hasn't run yet.
@@ -174,6 +352,96 @@ class VideoTranscript(BaseModel):
     """
 
     video_path: Path
+    start_time: float | None = None
+    end_time: float | None = None
+
+    _future: Future[tuple[Path, str]] | None = PrivateAttr(default=None)
+    _future_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    # Interned instances, keyed by class, resolved video path and time range.
+    # Entries go away once no caller holds the instance any more.
+    _registry: ClassVar[
+        WeakValueDictionary[
+            tuple[type, Path, float | None, float | None], VideoTranscript
+        ]
+    ] = WeakValueDictionary()
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @model_validator(mode="after")
+    def _check_time_range(self) -> Self:
+        """Reject negative or empty time ranges, as `many` does."""
+        check_time_range(self.start_time, self.end_time)
+        return self
+
+    @classmethod
+    def for_path(
+        cls,
+        video_path: Path | str,
+        *,
+        start_time: float | None = None,
+        end_time: float | None = None,
+    ) -> VideoTranscript:
+        """
+        Get the shared instance for a video file.
+
+        Paths that resolve to the same file return the same instance, so
+        processing results are computed once and shared by all callers.
+
+        Args:
+            video_path: The path to the input video file.
+            start_time: Start of the time range to transcribe, in seconds.
+            end_time: End of the time range to transcribe, in seconds.
+
+        Returns:
+            The interned `VideoTranscript` for `video_path` and the range.
+        """
+        return cls.many([video_path], start_time=start_time, end_time=end_time)[0]
+
+    @classmethod
+    def many(
+        cls,
+        video_paths: Iterable[Path | str],
+        *,
+        start_time: float | None = None,
+        end_time: float | None = None,
+    ) -> list[VideoTranscript]:
+        """
+        Get the shared instances for many video files at once.
+
+        All paths and the time range are validated in a single pass, then
+        each path is looked up in the registry of interned instances; only
+        paths not seen before create a new instance, without validating again.
+
+        Args:
+            video_paths: Paths to the input video files, e.g. from a manifest.
+            start_time: Start of the time range to transcribe, in seconds.
+            end_time: End of the time range to transcribe, in seconds.
+
+        Returns:
+            One instance per input path, in order. Duplicates of the same
+            file share one instance.
+
+        Raises:
+            pydantic.ValidationError: If any of the paths or range bounds is
+                invalid.
+            ValueError: If the time range is negative or empty.
+        """
+        paths = _PATH_LIST.validate_python(list(video_paths))
+        start_time = _SECONDS.validate_python(start_time)
+        end_time = _SECONDS.validate_python(end_time)
+        check_time_range(start_time, end_time)
+        instances = []
+        with cls._registry_lock:
+            for path in paths:
+                key = (cls, path.resolve(), start_time, end_time)
+                instance = cls._registry.get(key)
+                if instance is None:
+                    instance = cls.model_construct(
+                        video_path=path, start_time=start_time, end_time=end_time
+                    )
+                    cls._registry[key] = instance
+                instances.append(instance)
+        return instances
 
     @computed_field(alias="audio_path", repr=False) # repr=False to avoid inclusion in model repr if desired
     @cached_property
@@ -185,7 +453,7 @@ class VideoTranscript(BaseModel):
         `process_video_flow` to extract audio and generate the transcript.
         The result is cached.
         """
-        audio, _ = process_video_flow(self.video_path)
+        audio, _ = self._process()
         return audio
 
     @computed_field(alias="text_transcript", repr=False) # repr=False to avoid inclusion in model repr if desired
@@ -198,5 +466,184 @@ class VideoTranscript(BaseModel):
         `process_video_flow` to extract audio and generate the transcript.
         The result is cached.
         """
-        _, transcript = process_video_flow(self.video_path)
+        _, transcript = self._process()
         return transcript
+
+    def start(self) -> Future[tuple[Path, str]]:
+        """
+        Start processing the video in the background.
+
+        Processing runs `process_video_flow` on a shared thread pool. Calling
+        `start` again, or reading `audio_path` or `text_transcript`, reuses
+        the same run. A run that failed is retried on the next call.
+
+        Returns:
+            A future resolving to the `(audio_path, transcript)` tuple.
+        """
+        return self._ensure_future(background=True)
+
+    @classmethod
+    def prefetch(
+        cls, transcripts: Iterable[VideoTranscript]
+    ) -> list[Future[tuple[Path, str]]]:
+        """
+        Start processing several videos in the background.
+
+        Args:
+            transcripts: The instances to warm up, e.g. the next videos a
+                service is going to need.
+
+        Returns:
+            One future per instance, in order.
+        """
+        return [vt.start() for vt in transcripts]
+
+    def _process(self) -> tuple[Path, str]:
+        """Return the flow result, running it in this thread if not started yet."""
+        return self._ensure_future(background=False).result()
+
+    def _ensure_future(self, *, background: bool) -> Future[tuple[Path, str]]:
+        """Return the future of the current run, creating a run if needed."""
+        with self._future_lock:
+            future = self._future
+            if future is not None and not (
+                future.done() and (future.cancelled() or future.exception())
+            ):
+                return future
+            future = self._future = Future()
+        if background:
+            _prefetch_executor().submit(self._run, future)
+        else:
+            self._run(future)
+        return future
+
+    def _run(self, future: Future[tuple[Path, str]]) -> None:
+        """Run `process_video_flow` and report its outcome through `future`."""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(
+                process_video_flow(
+                    self.video_path, start=self.start_time, end=self.end_time
+                )
+            )
+        except BaseException as exc:  # noqa: BLE001 - reported to the waiters
+            future.set_exception(exc)
+
+    def _pending_fields(self) -> set[str]:
+        """Names of the computed fields that would trigger processing if read."""
+        future = self._future
+        if (
+            future is not None
+            and future.done()
+            and not future.cancelled()
+            and future.exception() is None
+        ):
+            return set()
+        return {
+            name
+            for name in type(self).model_computed_fields
+            if name not in self.__dict__
+        }
+
+    @classmethod
+    def dump_many(
+        cls,
+        transcripts: Iterable[VideoTranscript],
+        *,
+        missing: Literal["skip", "compute"] = "skip",
+        max_workers: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Serialize a collection of transcripts in one pass.
+
+        Calling `model_dump` on an unprocessed instance silently runs the
+        whole flow for it. This method decides up front what happens to
+        computed fields that are not cached yet.
+
+        Args:
+            transcripts: The instances to serialize.
+            missing: ``"skip"`` leaves uncomputed fields out of the output
+                without triggering any work. ``"compute"`` first processes
+                all unprocessed videos as one parallel batch.
+            max_workers: Number of videos processed concurrently when
+                `missing` is ``"compute"``.
+
+        Returns:
+            One dictionary per instance, as returned by `model_dump`.
+        """
+        items, exclude = cls._prepare_dump(transcripts, missing, max_workers)
+        dumped: list[dict[str, Any]] = _list_adapter(cls).dump_python(
+            items, exclude=exclude
+        )
+        return dumped
+
+    @classmethod
+    def dump_many_json(
+        cls,
+        transcripts: Iterable[VideoTranscript],
+        *,
+        missing: Literal["skip", "compute"] = "skip",
+        max_workers: int | None = None,
+    ) -> str:
+        """
+        Serialize a collection of transcripts to a JSON array in one pass.
+
+        See `dump_many` for the meaning of the arguments.
+        """
+        items, exclude = cls._prepare_dump(transcripts, missing, max_workers)
+        return _list_adapter(cls).dump_json(items, exclude=exclude).decode()
+
+    @classmethod
+    def _prepare_dump(
+        cls,
+        transcripts: Iterable[VideoTranscript],
+        missing: Literal["skip", "compute"],
+        max_workers: int | None,
+    ) -> tuple[list[VideoTranscript], dict[int, set[str]]]:
+        """Compute or exclude missing fields; return the items and the exclusions."""
+        if missing not in ("skip", "compute"):
+            msg = f"missing must be 'skip' or 'compute', got {missing!r}"
+            raise ValueError(msg)
+        items = list(transcripts)
+        if missing == "compute":
+            # Interned instances may appear several times; process each once.
+            pending = {id(vt): vt for vt in items if vt._pending_fields()}
+            with ThreadPoolExecutor(max_workers) as pool:
+                futures = [
+                    pool.submit(vt._fill_computed_fields) for vt in pending.values()
+                ]
+            for future in futures:
+                future.result()
+        exclude = {
+            i: fields for i, vt in enumerate(items) if (fields := vt._pending_fields())
+        }
+        return items, exclude
+
+    def _fill_computed_fields(self) -> None:
+        """Compute and cache every computed field."""
+        for name in self._pending_fields():
+            getattr(self, name)
+
+
+_PATH_LIST = TypeAdapter(list[Path])
+_SECONDS = TypeAdapter(float | None)
+
+
+@cache
+def _list_adapter(model: type[VideoTranscript]) -> TypeAdapter[list[Any]]:
+    """Return a cached adapter serializing lists of `model` instances."""
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _prefetch_executor() -> ThreadPoolExecutor:
+    """Return the thread pool running background `VideoTranscript` work."""
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="twat-task-prefetch")
+        return _executor
@@ -0,0 +1,400 @@
+"""
+Sharded execution of video jobs through a local SQLite work queue.
+
+This is a self-contained alternative to running a Prefect server with work
+pools. Videos are enqueued into a SQLite database; any number of worker
+processes, on one host or on several hosts sharing the filesystem, claim
+jobs from it and run the same logic as `process_video_flow`.
+
+Each claimed job carries a lease. A worker renews it with heartbeats while
+it processes the video; if the worker dies, the lease expires and the job is
+handed to another worker. Jobs that keep failing are marked as failed after
+`max_attempts` claims.
+
+Note:
+    SQLite relies on file locks. Use a filesystem whose locking works across
+    hosts (most local and SMB/NFSv4 mounts); avoid NFSv3 without lockd.
+    Leases are timestamps from each worker's own clock, so with several
+    hosts their clocks must be synchronized (e.g. with NTP) to well within
+    the lease duration; otherwise a host whose clock runs ahead requeues
+    jobs that are still being processed.
+
+Example:
+    >>> from pathlib import Path
+    >>> from twat_task.workqueue import WorkQueue, run_workers
+    >>> queue = WorkQueue(Path("jobs.sqlite"))
+    >>> queue.enqueue(sorted(Path("inbox").glob("*.mp4")))  # doctest: +SKIP
+    >>> run_workers(Path("jobs.sqlite"), processes=4)  # doctest: +SKIP
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from twat_task.task import (
+    extract_audio_task,
+    generate_transcript_task,
+    process_video,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    video_path TEXT NOT NULL UNIQUE,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    audio_path TEXT,
+    transcript TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    """
+    A video job claimed from a `WorkQueue`.
+
+    Attributes:
+        id: Identifier of the job in the queue.
+        video_path: The path to the input video file.
+        artifacts: Extra transcript outputs to write; see `process_video_flow`.
+        start: Start of the time range to transcribe, in seconds.
+        end: End of the time range to transcribe, in seconds.
+        attempts: Number of times the job has been claimed, this one included.
+    """
+
+    id: int
+    video_path: Path
+    artifacts: tuple[str, ...] = ()
+    start: float | None = None
+    end: float | None = None
+    attempts: int = 1
+
+
+class WorkQueue:
+    """
+    A persistent queue of video jobs with leases.
+
+    All methods open their own short-lived connection, so a queue object can
+    be used from several threads, and any number of processes can open the
+    same database.
+
+    Args:
+        db_path: The SQLite database file; created if missing.
+        lease_seconds: How long a claim stays valid without a heartbeat.
+        max_attempts: Claims after which a job that did not complete is
+            marked as failed instead of being requeued.
+    """
+
+    def __init__(
+        self, db_path: Path, *, lease_seconds: float = 60.0, max_attempts: int = 3
+    ) -> None:
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        db = self._connect()
+        try:
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction on a fresh connection."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def enqueue(
+        self,
+        video_paths: Iterable[Path],
+        *,
+        artifacts: Sequence[str] = (),
+        start: float | None = None,
+        end: float | None = None,
+    ) -> int:
+        """
+        Add videos to the queue.
+
+        Videos already in the queue, in any state, are left untouched.
+
+        Returns:
+            The number of videos added.
+        """
+        params = json.dumps({"artifacts": list(artifacts), "start": start, "end": end})
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (video_path, params) VALUES (?, ?)",
+                [(str(path), params) for path in video_paths],
+            )
+            return db.total_changes - before
+
+    def claim(self, worker_id: str) -> Job | None:
+        """
+        Lease the oldest queued job to a worker.
+
+        Expired leases are requeued first.
+
+        Returns:
+            The claimed job, or `None` if no job is queued.
+        """
+        with self._transaction() as db:
+            self._requeue_expired(db)
+            row = db.execute(
+                "SELECT id, video_path, params, attempts FROM jobs"
+                " WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, video_path, params, attempts = row
+            db.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (worker_id, time.time() + self.lease_seconds, job_id),
+            )
+        decoded = json.loads(params)
+        return Job(
+            id=job_id,
+            video_path=Path(video_path),
+            artifacts=tuple(decoded["artifacts"]),
+            start=decoded["start"],
+            end=decoded["end"],
+            attempts=attempts + 1,
+        )
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """
+        Extend the lease of a job held by `worker_id`.
+
+        Returns:
+            `False` if the worker no longer holds the lease.
+        """
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ?"
+                " AND status = 'leased'",
+                (time.time() + self.lease_seconds, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(
+        self, job_id: int, worker_id: str, audio_path: Path, transcript: str
+    ) -> bool:
+        """
+        Record the result of a job held by `worker_id`.
+
+        Returns:
+            `False` if the lease was lost meanwhile; the result is discarded.
+        """
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = 'done', worker = NULL, lease_expires = NULL,"
+                " audio_path = ?, transcript = ?, error = NULL"
+                " WHERE id = ? AND worker = ? AND status = 'leased'",
+                (str(audio_path), transcript, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> None:
+        """Give a job back after an error, failing it once out of attempts."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET"
+                " status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,"
+                " worker = NULL, lease_expires = NULL, error = ?"
+                " WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, error, job_id, worker_id),
+            )
+
+    def requeue_expired(self) -> int:
+        """
+        Requeue jobs whose lease has expired.
+
+        Returns:
+            The number of jobs requeued or failed.
+        """
+        with self._transaction() as db:
+            return self._requeue_expired(db)
+
+    def _requeue_expired(self, db: sqlite3.Connection) -> int:
+        cursor = db.execute(
+            "UPDATE jobs SET"
+            " status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,"
+            " worker = NULL, lease_expires = NULL, error = 'lease expired'"
+            " WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, time.time()),
+        )
+        return cursor.rowcount
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of jobs in each status."""
+        with self._transaction() as db:
+            rows = db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            return dict(rows.fetchall())
+
+    def results(self) -> list[tuple[Path, Path, str]]:
+        """Return `(video_path, audio_path, transcript)` for every completed job."""
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT video_path, audio_path, transcript FROM jobs"
+                " WHERE status = 'done' ORDER BY id"
+            ).fetchall()
+        return [(Path(video), Path(audio), text) for video, audio, text in rows]
+
+
+def process_job(job: Job) -> tuple[Path, str]:
+    """
+    Run the processing of `process_video_flow` for one job.
+
+    The task functions are called directly, without a Prefect server.
+    """
+    return process_video(
+        job.video_path,
+        job.artifacts,
+        job.start,
+        job.end,
+        extract=extract_audio_task.fn,
+        transcribe=generate_transcript_task.fn,
+    )
+
+
+def run_worker(  # noqa: PLR0913
+    db_path: Path,
+    *,
+    worker_id: str | None = None,
+    lease_seconds: float = 60.0,
+    max_attempts: int = 3,
+    poll_seconds: float = 1.0,
+    stop_when_empty: bool = True,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Claim and process jobs until the queue is drained or `stop` is set.
+
+    While a job runs, a background thread renews its lease every third of
+    `lease_seconds`.
+
+    Args:
+        db_path: The SQLite database of the queue.
+        worker_id: Unique name of this worker. Defaults to host, process and
+            thread identifiers.
+        lease_seconds: Lease duration of claimed jobs.
+        max_attempts: See `WorkQueue`.
+        poll_seconds: Wait between claims when no job is queued.
+        stop_when_empty: Return once no job is queued or leased, instead of
+            waiting for new jobs.
+        stop: Event that makes the worker return after its current job.
+
+    Returns:
+        The number of jobs this worker completed.
+    """
+    queue = WorkQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    worker_id = worker_id or (
+        f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    )
+    stop = stop or threading.Event()
+    completed = 0
+    while not stop.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            counts = queue.counts()
+            if (
+                stop_when_empty
+                and not counts.get("queued")
+                and not counts.get("leased")
+            ):
+                break
+            stop.wait(poll_seconds)
+            continue
+
+        done = threading.Event()
+        beat = threading.Thread(
+            target=_heartbeat,
+            args=(queue, job.id, worker_id, lease_seconds / 3, done),
+            daemon=True,
+        )
+        beat.start()
+        try:
+            audio, transcript = process_job(job)
+        except Exception as exc:  # noqa: BLE001 - reported to the queue
+            queue.fail(job.id, worker_id, repr(exc))
+        else:
+            completed += queue.complete(job.id, worker_id, audio, transcript)
+        finally:
+            done.set()
+            beat.join()
+    return completed
+
+
+def _heartbeat(
+    queue: WorkQueue,
+    job_id: int,
+    worker_id: str,
+    interval: float,
+    done: threading.Event,
+) -> None:
+    """Renew a lease until `done` is set or the lease is lost."""
+    while not done.wait(interval):
+        if not queue.heartbeat(job_id, worker_id):
+            return
+
+
+def run_workers(
+    db_path: Path,
+    *,
+    processes: int = 2,
+    start_method: str | None = None,
+    **options: float | bool,
+) -> list[int | None]:
+    """
+    Run several local worker processes until the queue is drained.
+
+    Args:
+        db_path: The SQLite database of the queue.
+        processes: Number of worker processes.
+        start_method: `multiprocessing` start method, e.g. ``"spawn"``.
+        **options: Keyword arguments passed to `run_worker`.
+
+    Returns:
+        The exit code of each worker process.
+    """
+    context = multiprocessing.get_context(start_method)
+    workers = [
+        context.Process(target=run_worker, args=(db_path,), kwargs=options)  # type: ignore[attr-defined]
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return [worker.exitcode for worker in workers]
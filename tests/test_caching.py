@@ -0,0 +1,167 @@
+"""Unit tests for the content-hash cache policies in twat_task.caching."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from prefect import Task
+from prefect.cache_policies import CachePolicy
+from twat_task.caching import (
+    CACHE_EXPIRATION_ENV,
+    RESULT_STORAGE_ENV,
+    FileContentInputs,
+    TranscriptInputs,
+    cache_expiration,
+    file_digest,
+    result_storage,
+    task_cache_options,
+)
+from twat_task.task import extract_audio_task, generate_transcript_task
+
+
+def _key(policy: FileContentInputs, **inputs: object) -> str | None:
+    return policy.compute_key(None, inputs, {})  # type: ignore[arg-type]
+
+
+def _task_key(task: Task[..., Any], **inputs: object) -> str | None:
+    """Compute a key with the task's own cache policy, as Prefect does."""
+    policy = task.cache_policy
+    assert isinstance(policy, CachePolicy)
+    return policy.compute_key(SimpleNamespace(task=task), inputs, {})  # type: ignore[arg-type]
+
+
+def test_key_follows_file_content_not_path(tmp_path: Path) -> None:
+    """Test keys change with file content and ignore where the file lives."""
+    first, second = tmp_path / "a.mp3", tmp_path / "b.mp3"
+    first.write_text('{"duration": 60}')
+    second.write_text('{"duration": 60}')
+    policy = TranscriptInputs()
+
+    key = _key(policy, audio_path=first, artifacts=(), start=None, end=None)
+    assert key == _key(policy, audio_path=second, artifacts=(), start=None, end=None)
+
+    stat = first.stat()
+    first.write_text('{"duration": 90}')
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert key != _key(policy, audio_path=first, artifacts=(), start=None, end=None)
+
+
+def test_key_includes_parameters(tmp_path: Path) -> None:
+    """Test non-file parameters are part of the key."""
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"video")
+    policy = FileContentInputs(files=("video_path",))
+
+    assert _key(policy, video_path=video, audio_path=tmp_path / "a.mp3") != _key(
+        policy, video_path=video, audio_path=tmp_path / "b.mp3"
+    )
+    assert _key(
+        FileContentInputs(files=("video_path",), exclude=("audio_path",)),
+        video_path=video,
+        audio_path=tmp_path / "a.mp3",
+    ) == _key(FileContentInputs(files=("video_path",)), video_path=video)
+
+
+def test_missing_inputs_and_artifacts_disable_caching(tmp_path: Path) -> None:
+    """Test runs are not cached without their input file or requested artifacts."""
+    audio = tmp_path / "a.mp3"
+    assert _key(TranscriptInputs(), audio_path=audio, artifacts=()) is None
+
+    audio.write_text('{"duration": 60}')
+    assert _key(TranscriptInputs(), audio_path=audio, artifacts=("srt",)) is None
+    audio.with_suffix(".srt").write_text("")
+    assert _key(TranscriptInputs(), audio_path=audio, artifacts=("srt",)) is not None
+
+
+def test_task_policies_decline_whole_key(tmp_path: Path) -> None:
+    """Test a declined run gets no key from the tasks' own policies."""
+    first, second = tmp_path / "a.mp3", tmp_path / "b.mp3"
+    first.write_text('{"duration": 60}')
+    second.write_text('{"duration": 90}')
+    transcribe = generate_transcript_task
+
+    # Missing artifacts or inputs: no key at all, not one shared by all runs
+    assert _task_key(transcribe, audio_path=first, artifacts=("srt",)) is None
+    assert _task_key(transcribe, audio_path=second, artifacts=("vtt",)) is None
+    missing_video = tmp_path / "x.mp4"
+    assert _task_key(extract_audio_task, video_path=missing_video) is None
+
+    cached = _task_key(transcribe, audio_path=first, artifacts=())
+    assert cached is not None
+    assert cached != _task_key(transcribe, audio_path=second, artifacts=())
+    # The task source is still part of the key
+    assert cached != _key(TranscriptInputs(), audio_path=first, artifacts=())
+
+
+def test_file_digest_is_memoized(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test unchanged files are read only once."""
+    path = tmp_path / "a.mp3"
+    path.write_bytes(b"audio")
+    digest = file_digest(path)
+
+    def fail(*_: object) -> None:
+        pytest.fail("file was read again")
+
+    monkeypatch.setattr("builtins.open", fail)
+    assert file_digest(path) == digest
+    assert file_digest(tmp_path / "missing.mp3") is None
+
+
+def test_different_files_are_hashed_in_parallel(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test hashing one file does not hold up hashing another."""
+    paths = [tmp_path / "a.mp4", tmp_path / "b.mp4"]
+    for path in paths:
+        path.write_bytes(path.name.encode())
+    # Both hashes must be in progress at once to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def digest(path: str, size: int, mtime_ns: int) -> str:
+        barrier.wait()
+        return path
+
+    monkeypatch.setattr("twat_task.caching._digest", digest)
+    with ThreadPoolExecutor(2) as pool:
+        digests = list(pool.map(file_digest, paths))
+    assert digests == [str(path.resolve()) for path in paths]
+
+
+def test_settings_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test expiration and result storage come from environment variables."""
+    monkeypatch.delenv(CACHE_EXPIRATION_ENV, raising=False)
+    monkeypatch.delenv(RESULT_STORAGE_ENV, raising=False)
+    assert cache_expiration() is None
+    assert result_storage() is None
+
+    monkeypatch.setenv(CACHE_EXPIRATION_ENV, "3600")
+    monkeypatch.setenv(RESULT_STORAGE_ENV, "local-file-system/transcripts")
+    assert cache_expiration() == timedelta(hours=1)
+    assert result_storage() == "local-file-system/transcripts"
+
+    monkeypatch.setenv(CACHE_EXPIRATION_ENV, "soon")
+    with pytest.raises(ValueError, match=CACHE_EXPIRATION_ENV):
+        cache_expiration()
+
+
+def test_invalid_expiration_fails_at_run_not_import(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a bad expiration only warns when tasks are defined, but fails runs."""
+    monkeypatch.setenv(CACHE_EXPIRATION_ENV, "soon")
+    with pytest.warns(RuntimeWarning, match=CACHE_EXPIRATION_ENV):
+        options = task_cache_options(TranscriptInputs())
+    assert options["cache_expiration"] is None
+
+    monkeypatch.setattr("time.sleep", lambda *_: None)
+    audio = tmp_path / "a.mp3"
+    audio.write_text('{"duration": 60}')
+    with pytest.raises(ValueError, match=CACHE_EXPIRATION_ENV):
+        generate_transcript_task.fn(audio_path=audio)
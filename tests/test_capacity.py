@@ -0,0 +1,82 @@
+"""Unit tests for the capacity simulator in twat_task.capacity."""
+
+from pathlib import Path
+
+import pytest
+from twat_task.capacity import (
+    CostModel,
+    sample_durations,
+    simulate,
+    validate,
+)
+
+
+def test_cost_model_matches_mock_tasks() -> None:
+    """Test the default cost model reflects the delays of the mock tasks."""
+    model = CostModel()
+    assert model.extract_time(600) == pytest.approx(7.0)
+    # 180 s of audio is 6 chunks of 0.3 s on top of the 1.5 s overhead
+    assert model.transcribe_time(180) == pytest.approx(1.5 + 6 * 0.3)
+    assert model.transcribe_time(29) == pytest.approx(1.5)
+
+
+def test_simulate_backlog_single_worker() -> None:
+    """Test a backlog drained by one worker per stage is fully pipelined."""
+    model = CostModel(
+        extract_seconds=2.0, transcribe_setup_seconds=1.0, chunk_call_seconds=0.0
+    )
+    report = simulate([60, 60, 60], cost_model=model)
+
+    # Extraction is the bottleneck: jobs finish at 3, 5 and 7 seconds.
+    assert [t.transcribe_end for t in report.traces] == [3.0, 5.0, 7.0]
+    assert report.makespan == pytest.approx(7.0)
+    assert report.throughput == pytest.approx(3 / 7)
+    assert report.max_queue_depth == 2
+    assert report.p50_latency == pytest.approx(5.0)
+
+
+def test_simulate_more_workers_cut_latency() -> None:
+    """Test adding workers increases throughput and lowers tail latency."""
+    durations = sample_durations(200, seed=7)
+    small = simulate(durations, arrival_rate=0.1, seed=3)
+    large = simulate(
+        durations, arrival_rate=0.1, extract_workers=2, transcribe_workers=4, seed=3
+    )
+
+    assert large.throughput > small.throughput
+    assert large.p99_latency < small.p99_latency
+    assert large.mean_queue_depth < small.mean_queue_depth
+
+
+def test_simulate_rejects_invalid_workers() -> None:
+    """Test simulate requires at least one worker per stage."""
+    with pytest.raises(ValueError):
+        simulate([60], extract_workers=0)
+
+
+def test_validate_against_real_run(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the prediction matches a real run timed on a simulated clock."""
+    # The tasks' sleeps advance a simulated clock instead of waiting, so the
+    # observed timeline is exactly the time the tasks claim to take. One
+    # worker and one video keep the two stages from overlapping in time.
+    now = 0.0
+
+    def sleep(seconds: float) -> None:
+        nonlocal now
+        now += seconds
+
+    monkeypatch.setattr("time.sleep", sleep)
+
+    video = tmp_path / "video.mp4"
+    video.touch()
+
+    predicted, observed = validate([video], clock=lambda: now)
+
+    assert observed.jobs == predicted.jobs == 1
+    (trace,) = observed.traces
+    (expected,) = predicted.traces
+    assert trace.extract_end == pytest.approx(expected.extract_end)
+    assert trace.transcribe_end == pytest.approx(expected.transcribe_end)
+    assert observed.makespan == pytest.approx(predicted.makespan)
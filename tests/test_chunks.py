@@ -0,0 +1,133 @@
+"""Unit tests for chunk helpers in twat_task.chunks."""
+
+import json
+import os
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from twat_task.chunks import (
+    METADATA_MAX_BYTES,
+    AudioChunkReader,
+    ChunkCache,
+    chunk_range,
+)
+
+
+def test_chunk_range_selects_overlapping_chunks() -> None:
+    """Test only full chunks overlapping the window are selected."""
+    assert chunk_range(300, 30) == range(10)
+    assert chunk_range(95, 30) == range(3)
+    assert chunk_range(300, 30, start=45, end=100) == range(1, 4)
+    assert chunk_range(300, 30, start=60, end=90) == range(2, 3)
+    assert chunk_range(300, 30, start=250) == range(8, 10)
+    assert chunk_range(300, 30, start=900) == range(10, 10)
+
+    with pytest.raises(ValueError):
+        chunk_range(300, 30, start=100, end=50)
+
+
+def test_chunk_cache_persists_and_merges(tmp_path: Path) -> None:
+    """Test cached chunks survive across instances and merge on save."""
+    audio = tmp_path / "clip.mp3"
+    audio.write_text("{}")
+
+    first, second = ChunkCache(audio), ChunkCache(audio)
+    first.put(0, "zero")
+    second.put(5, "five")
+    first.save()
+    second.save()
+
+    reloaded = ChunkCache(audio)
+    assert reloaded.get(0) == "zero"
+    assert reloaded.get(5) == "five"
+    assert reloaded.get(1) is None
+
+
+def test_chunk_cache_invalidated_when_audio_changes(tmp_path: Path) -> None:
+    """Test the cache is discarded once the audio file changes."""
+    audio = tmp_path / "clip.mp3"
+    audio.write_text("{}")
+    cache = ChunkCache(audio)
+    cache.put(0, "stale")
+    cache.save()
+
+    audio.write_text('{"duration": 60}')
+    os.utime(audio, ns=(0, 0))
+    assert ChunkCache(audio).get(0) is None
+
+
+def test_chunk_cache_entries_expire(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test entries older than max_age are dropped on load."""
+    audio = tmp_path / "clip.mp3"
+    audio.write_text("{}")
+    cache = ChunkCache(audio)
+    cache.put(0, "old")
+    cache.save()
+
+    later = time.time() + 120
+    monkeypatch.setattr("time.time", lambda: later)
+    assert ChunkCache(audio, max_age=timedelta(minutes=5)).get(0) == "old"
+    assert ChunkCache(audio, max_age=timedelta(minutes=1)).get(0) is None
+    assert ChunkCache(audio).get(0) == "old"
+
+
+def test_audio_chunk_reader_slices_by_bitrate(tmp_path: Path) -> None:
+    """Test chunks are views into the mapping at bitrate-derived offsets."""
+    audio = tmp_path / "a.mp3"
+    header = json.dumps({"duration": 4, "bitrate": "0.8kbps"}).encode()
+    audio.write_bytes(header)
+
+    with AudioChunkReader(audio) as reader:
+        assert reader.metadata["duration"] == 4
+        assert reader.bytes_per_second == 100
+        with reader.chunk(0, 1) as first, reader.chunk(1, 1) as second:
+            assert isinstance(first, memoryview)
+            assert first.obj is second.obj  # Both slice the same mapping
+            assert bytes(first) == header[:100]
+            assert bytes(second) == header[100:200]
+        with reader.chunk(9, 1) as past_end:
+            assert len(past_end) == 0
+
+    with pytest.raises(ValueError, match="not open"):
+        _ = reader.data
+
+
+def test_audio_chunk_reader_without_bitrate_or_data(tmp_path: Path) -> None:
+    """Test offsets spread the file over its duration, and empty files map."""
+    audio = tmp_path / "a.mp3"
+    audio.write_text(json.dumps({"duration": 2}))
+    with AudioChunkReader(audio) as reader:
+        assert reader.bytes_per_second == len(audio.read_bytes()) / 2
+
+    empty = tmp_path / "empty.mp3"
+    empty.touch()
+    with AudioChunkReader(empty) as reader:
+        assert len(reader.data) == 0
+        with reader.chunk(0, 30) as data:
+            assert len(data) == 0
+
+
+def test_audio_chunk_reader_metadata_reads_only_header(tmp_path: Path) -> None:
+    """Test metadata is parsed from the header without copying the audio."""
+    audio = tmp_path / "a.mp3"
+    payload = 8 * 1024 * 1024
+    audio.write_bytes(json.dumps({"duration": 60}).encode() + bytes(payload))
+
+    with AudioChunkReader(audio) as reader:
+        tracemalloc.start()
+        try:
+            assert reader.metadata["duration"] == 60
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert peak < payload / 10  # Far below the size of the mapping
+
+    garbage = tmp_path / "garbage.mp3"
+    garbage.write_bytes(bytes(METADATA_MAX_BYTES + 1))
+    with AudioChunkReader(garbage) as reader, pytest.raises(ValueError, match="JSON"):
+        _ = reader.metadata
@@ -1,5 +1,6 @@
 """Unit tests for flows in twat_task.task."""
 
+import json
 from pathlib import Path
 from typing import Tuple
 from unittest.mock import MagicMock
@@ -86,3 +87,56 @@ def test_process_video_flow_return_values(
 
     assert audio_path == expected_audio_path
     assert transcript_text == expected_transcript
+
+
+def test_process_video_flow_passes_artifacts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test requested artifacts are forwarded to the transcription task."""
+    video_file = tmp_path / "test.mp4"
+    video_file.with_suffix(".mp3").touch()
+
+    mock_generate = MagicMock(return_value="transcript")
+    monkeypatch.setattr("twat_task.task.generate_transcript_task", mock_generate)
+
+    process_video_flow.fn(video_path=video_file, artifacts=["srt", "vtt"])
+
+    mock_generate.assert_called_once_with(
+        video_file.with_suffix(".mp3"), artifacts=("srt", "vtt"), start=None, end=None
+    )
+
+
+def test_process_video_flow_writes_cached_audio(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test audio metadata returned from the task cache is written to disk."""
+    video_file = tmp_path / "test.mp4"
+    video_file.touch()
+    metadata = {"duration": 60, "codec": "aac"}
+
+    # A cache hit returns the result without running the task body
+    monkeypatch.setattr(
+        "twat_task.task.extract_audio_task", MagicMock(return_value=metadata)
+    )
+    monkeypatch.setattr(
+        "twat_task.task.generate_transcript_task", MagicMock(return_value="text")
+    )
+
+    audio_path, _ = process_video_flow.fn(video_path=video_file)
+
+    assert json.loads(audio_path.read_text()) == metadata
+
+
+def test_process_video_flow_rejects_unknown_artifact_first(
+    tmp_path: Path, mock_tasks: Tuple[MagicMock, MagicMock]
+) -> None:
+    """Test an unknown artifact kind fails before any task runs."""
+    mock_extract_audio, mock_generate_transcript = mock_tasks
+    video_file = tmp_path / "video.mp4"
+    video_file.touch()
+
+    with pytest.raises(ValueError, match="docx"):
+        process_video_flow.fn(video_path=video_file, artifacts=("docx",))
+
+    mock_extract_audio.assert_not_called()
+    mock_generate_transcript.assert_not_called()
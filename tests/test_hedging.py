@@ -0,0 +1,149 @@
+"""Unit tests for hedged chunk calls in twat_task.hedging."""
+
+import itertools
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+from twat_task.hedging import Hedger, configure_hedger
+from twat_task.ratelimit import RateLimiter
+from twat_task.task import generate_transcript_task
+
+
+@pytest.fixture(autouse=True)
+def reset_hedger() -> Iterator[None]:
+    """Restore a disabled task hedger after each test."""
+    yield
+    configure_hedger()
+
+
+def _straggle_first(release: threading.Event) -> Callable[[], str]:
+    """Return a call whose first attempt hangs until `release` is set."""
+    attempts = itertools.count()
+
+    def call() -> str:
+        if next(attempts) == 0:
+            release.wait(5)
+            return "primary"
+        return "hedge"
+
+    return call
+
+
+def test_disabled_hedger_calls_inline() -> None:
+    """Test calls run directly in the caller's thread without hedging."""
+    hedger = Hedger()
+    assert hedger.call(threading.current_thread) is threading.current_thread()
+    assert hedger.metrics().calls == 0
+
+
+def test_straggler_is_hedged_and_hedge_wins() -> None:
+    """Test a call slower than the delay gets a second attempt that answers."""
+    release = threading.Event()
+    hedger = Hedger(95, budget=1.0, initial_delay=0.01)
+    try:
+        assert hedger.call(_straggle_first(release)) == "hedge"
+    finally:
+        release.set()
+
+    metrics = hedger.metrics()
+    assert (metrics.calls, metrics.hedged, metrics.hedge_wins) == (1, 1, 1)
+    assert metrics.win_rate == 1.0
+
+
+def test_budget_caps_extra_calls() -> None:
+    """Test stragglers are not hedged once the budget is used up."""
+    release = threading.Event()
+    hedger = Hedger(95, budget=0.0, initial_delay=0.01)
+    threading.Timer(0.1, release.set).start()
+    assert hedger.call(_straggle_first(release)) == "primary"
+
+    metrics = hedger.metrics()
+    assert (metrics.hedged, metrics.budget_denied) == (0, 1)
+
+
+def test_limiter_wait_is_not_latency() -> None:
+    """Test a call queued behind the limiter is neither hedged nor slow."""
+    limiter = RateLimiter(max_concurrency=1)
+    hedger = Hedger(95, budget=1.0, min_samples=1, initial_delay=0.01)
+    holding = threading.Event()
+
+    def hold_slot() -> None:
+        with limiter.acquire():
+            holding.set()
+            time.sleep(0.2)
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    holding.wait()
+    assert hedger.call(lambda: "done", limiter=limiter) == "done"
+    holder.join()
+
+    assert hedger.metrics().hedged == 0
+    delay = hedger.delay()
+    assert delay is not None
+    assert delay < 0.1
+
+
+def test_hedge_not_started_while_limiter_blocks() -> None:
+    """Test a straggler is not hedged when the hedge would wait on the limiter."""
+    release = threading.Event()
+    limiter = RateLimiter(max_concurrency=1)
+    hedger = Hedger(95, budget=1.0, initial_delay=0.01)
+    threading.Timer(0.1, release.set).start()
+
+    assert hedger.call(_straggle_first(release), limiter=limiter) == "primary"
+    assert (hedger.metrics().hedged, hedger.metrics().throttled) == (0, 1)
+
+
+def test_queued_loser_skips_call_and_frees_limiter() -> None:
+    """Test a hedge still queued when the primary answers never calls fn."""
+    release = threading.Event()
+    calls = itertools.count()
+    limiter = RateLimiter(max_concurrency=2)
+    # One worker: the hedge queues behind the straggling primary
+    hedger = Hedger(95, budget=1.0, initial_delay=0.01, max_workers=1)
+
+    def call() -> str:
+        next(calls)
+        release.wait(5)
+        return "primary"
+
+    threading.Timer(0.1, release.set).start()
+    assert hedger.call(call, limiter=limiter) == "primary"
+    time.sleep(0.05)  # Let a started loser run to completion
+
+    assert next(calls) == 1  # fn ran once
+    assert hedger.metrics().hedged == 1
+    with limiter.try_acquire() as first, limiter.try_acquire() as second:
+        assert first and second
+
+
+def test_delay_follows_latency_percentile() -> None:
+    """Test the delay comes from observed latencies once warmed up."""
+    hedger = Hedger(50, min_samples=3)
+    assert hedger.delay() is None
+    for _ in range(3):
+        hedger.call(lambda: None)
+    delay = hedger.delay()
+    assert delay is not None
+    assert 0 <= delay < 1
+
+
+def test_generate_transcript_task_uses_hedger(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test each transcription chunk goes through the configured hedger."""
+    monkeypatch.setattr("time.sleep", lambda *_: None)
+    hedger = configure_hedger(95, initial_delay=10)
+
+    audio_file = tmp_path / "test_audio.mp3"
+    audio_file.write_text(json.dumps({"duration": 150}))
+    transcript = generate_transcript_task.fn(audio_path=audio_file)
+
+    assert len(transcript.split()) >= 5 * 5
+    assert hedger.metrics().calls == 5
+    assert hedger.metrics().hedged == 0
@@ -0,0 +1,70 @@
+"""Unit tests for opt-in task profiling in twat_task.profiling."""
+
+import json
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from twat_task.profiling import PROFILE_DIR_ENV, enable_profiling, profile_report
+from twat_task.task import generate_transcript_task
+
+
+@pytest.fixture(autouse=True)
+def no_profiling(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Start and end every test with profiling off."""
+    monkeypatch.setattr("time.sleep", lambda *_: None)
+    monkeypatch.delenv(PROFILE_DIR_ENV, raising=False)
+    yield
+    enable_profiling(None)
+
+
+@pytest.fixture
+def audio_file(tmp_path: Path) -> Path:
+    """Create a mock audio file."""
+    audio = tmp_path / "audio" / "test_audio.mp3"
+    audio.parent.mkdir()
+    audio.write_text(json.dumps({"duration": 120}))
+    return audio
+
+
+def test_profiling_off_by_default(tmp_path: Path, audio_file: Path) -> None:
+    """Test no profiles are written unless profiling is turned on."""
+    generate_transcript_task.fn(audio_path=audio_file)
+    assert not list(tmp_path.rglob("*.prof"))
+
+
+def test_profiling_writes_per_run_profiles(tmp_path: Path, audio_file: Path) -> None:
+    """Test each run writes a cProfile and an allocation file."""
+    profiles = tmp_path / "profiles"
+    enable_profiling(profiles)
+
+    generate_transcript_task.fn(audio_path=audio_file)
+    generate_transcript_task.fn(audio_path=audio_file, start=30)
+
+    assert len(list(profiles.glob("generate_transcript_task-*.prof"))) == 2
+    assert len(list(profiles.glob("generate_transcript_task-*.alloc.json"))) == 2
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_report_aggregates_runs(
+    tmp_path: Path, audio_file: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the report merges all runs of a directory."""
+    profiles = tmp_path / "profiles"
+    monkeypatch.setenv(PROFILE_DIR_ENV, str(profiles))
+    for _ in range(3):
+        generate_transcript_task.fn(audio_path=audio_file)
+
+    report = profile_report(profiles, top=50)
+
+    assert report.runs == 3
+    task_stats = [
+        f for f in report.functions if "generate_transcript_task" in f.function
+    ]
+    assert task_stats
+    assert task_stats[0].calls == 3
+    assert report.functions == sorted(
+        report.functions, key=lambda f: f.cumulative_time, reverse=True
+    )
+    assert "Top allocation sites:" in report.format()
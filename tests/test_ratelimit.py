@@ -0,0 +1,109 @@
+"""Unit tests for the transcription rate limiter in twat_task.ratelimit."""
+
+import itertools
+import json
+import multiprocessing
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from twat_task.ratelimit import RateLimiter, configure_rate_limiter
+from twat_task.task import generate_transcript_task
+
+
+@pytest.fixture(autouse=True)
+def reset_limiter() -> Iterator[None]:
+    """Restore an unlimited task limiter after each test."""
+    yield
+    configure_rate_limiter()
+
+
+def _hold_slot(state_dir: Path, log: Path) -> None:
+    """Acquire the shared limiter a few times, logging when each call ran."""
+    limiter = RateLimiter(rate=20, burst=1, max_concurrency=1, state_dir=state_dir)
+    for _ in range(3):
+        with limiter.acquire():
+            started = time.time()
+            time.sleep(0.01)
+            with log.open("a") as handle:
+                handle.write(f"{started} {time.time()}\n")
+
+
+def test_token_bucket_spaces_calls() -> None:
+    """Test calls beyond the burst wait for tokens and are counted."""
+    limiter = RateLimiter(rate=100, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        with limiter.acquire():
+            pass
+
+    assert time.monotonic() - started >= 0.045
+    metrics = limiter.metrics()
+    assert metrics.calls == 6
+    assert metrics.waited_calls >= 4
+    assert metrics.max_wait > 0
+
+
+def test_concurrency_cap_across_threads() -> None:
+    """Test no more than max_concurrency calls run at once."""
+    limiter = RateLimiter(max_concurrency=2)
+    lock = threading.Lock()
+    active = peak = 0
+
+    def call() -> None:
+        nonlocal active, peak
+        with limiter.acquire():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert limiter.metrics().waited_calls >= 4
+
+
+def test_limiter_shared_between_processes(tmp_path: Path) -> None:
+    """Test the state directory coordinates separate processes."""
+    log = tmp_path / "calls.log"
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_hold_slot, args=(tmp_path / "state", log))
+        for _ in range(2)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    calls = sorted(
+        tuple(map(float, line.split())) for line in log.read_text().splitlines()
+    )
+    assert len(calls) == 6
+    # One slot: calls never overlap. 20 calls/s: six calls span at least 0.25 s.
+    assert all(prev[1] <= nxt[0] for prev, nxt in itertools.pairwise(calls))
+    assert calls[-1][0] - calls[0][0] >= 0.2
+
+
+def test_generate_transcript_task_uses_limiter(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test each transcription chunk goes through the configured limiter."""
+    monkeypatch.setattr("time.sleep", lambda *_: None)
+    limiter = configure_rate_limiter(rate=1000, burst=1000, max_concurrency=4)
+
+    audio_file = tmp_path / "test_audio.mp3"
+    audio_file.write_text(json.dumps({"duration": 150}))
+    generate_transcript_task.fn(audio_path=audio_file)
+
+    assert limiter.metrics().calls == 5
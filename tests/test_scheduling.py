@@ -0,0 +1,83 @@
+"""Unit tests for batch scheduling in twat_task.scheduling."""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from twat_task.capacity import simulate
+from twat_task.scheduling import BatchJob, probe_duration, run_batch, schedule
+
+
+def _jobs(*durations: int | None) -> list[BatchJob]:
+    return [
+        BatchJob(video_path=Path(f"v{i}.mp4"), index=i, duration=d)
+        for i, d in enumerate(durations)
+    ]
+
+
+def test_probe_duration_reads_audio_metadata(tmp_path: Path) -> None:
+    """Test probe_duration uses existing metadata and reports unknowns."""
+    video = tmp_path / "clip.mp4"
+    assert probe_duration(video) is None
+
+    video.with_suffix(".mp3").write_text(json.dumps({"duration": 95}))
+    assert probe_duration(video) == 95
+
+
+def test_schedule_sjf_and_fifo() -> None:
+    """Test shortest-job-first reorders the batch and FIFO keeps it."""
+    jobs = _jobs(3600, 60, None, 600)
+
+    assert [j.index for j in schedule(jobs, "fifo")] == [0, 1, 2, 3]
+    # The unknown duration is estimated as the median of known ones (600).
+    assert [j.index for j in schedule(jobs, "sjf")] == [1, 2, 3, 0]
+
+
+def test_schedule_deadline_and_priority() -> None:
+    """Test deadline and priority-weighted policies."""
+    jobs = [
+        BatchJob(Path("a.mp4"), index=0, duration=60),
+        BatchJob(Path("b.mp4"), index=1, duration=3600, deadline=100.0),
+        BatchJob(Path("c.mp4"), index=2, duration=1800, deadline=50.0),
+    ]
+    assert [j.index for j in schedule(jobs, "deadline")] == [2, 1, 0]
+
+    weighted = [
+        BatchJob(Path("a.mp4"), index=0, duration=600),
+        BatchJob(Path("b.mp4"), index=1, duration=3600, priority=100.0),
+    ]
+    assert [j.index for j in schedule(weighted, "priority")] == [1, 0]
+
+    with pytest.raises(ValueError):
+        schedule(jobs, "random")  # type: ignore[arg-type]
+
+
+def test_sjf_cuts_simulated_latency() -> None:
+    """Test SJF lowers mean latency when a long video heads the batch."""
+    durations = [3600] + [60] * 50
+    jobs = _jobs(*durations)
+    ordered = [j.duration or 0 for j in schedule(jobs, "sjf")]
+
+    fifo = simulate(durations, extract_workers=2, transcribe_workers=2)
+    sjf = simulate(ordered, extract_workers=2, transcribe_workers=2)
+    assert sjf.mean_latency < fifo.mean_latency
+
+
+def test_run_batch_runs_in_scheduled_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test run_batch processes in policy order but returns input order."""
+    videos = [tmp_path / "long.mp4", tmp_path / "short.mp4"]
+    videos[0].with_suffix(".mp3").write_text(json.dumps({"duration": 3000}))
+    videos[1].with_suffix(".mp3").write_text(json.dumps({"duration": 60}))
+
+    mock_flow = MagicMock(
+        side_effect=lambda path: (path.with_suffix(".mp3"), path.stem)
+    )
+    monkeypatch.setattr("twat_task.scheduling.process_video_flow", mock_flow)
+
+    results = run_batch(videos, policy="sjf")
+
+    assert [call.args[0] for call in mock_flow.call_args_list] == videos[::-1]
+    assert [text for _, text in results] == ["long", "short"]
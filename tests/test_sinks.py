@@ -0,0 +1,141 @@
+"""Unit tests for the result sinks in twat_task.sinks."""
+
+import json
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from twat_task.scheduling import BatchError, run_batch
+from twat_task.sinks import JsonlSink, ParquetSink, ResultSink
+
+
+def test_jsonl_sink_appends_and_resumes(tmp_path: Path) -> None:
+    """Test records are appended, deduplicated and skipped on reopen."""
+    path = tmp_path / "results.jsonl"
+    with JsonlSink(path) as sink:
+        assert sink.write(Path("a.mp4"), Path("a.mp3"), "first")
+        assert not sink.write(Path("a.mp4"), Path("a.mp3"), "again")
+
+    # Simulate a crash in the middle of the next record
+    with path.open("a") as handle:
+        handle.write('{"video_path": "b.m')
+
+    with JsonlSink(path) as sink:
+        assert Path("a.mp4") in sink
+        assert Path("b.mp4") not in sink
+        sink.write(Path("b.mp4"), Path("b.mp3"), "second")
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["video_path"] for r in records] == ["a.mp4", "b.mp4"]
+    assert records[0] == {
+        "video_path": "a.mp4",
+        "audio_path": "a.mp3",
+        "transcript": "first",
+    }
+
+
+def test_jsonl_sink_flushes_periodically(tmp_path: Path) -> None:
+    """Test buffered records reach the file every flush_every records."""
+    path = tmp_path / "results.jsonl"
+    sink = JsonlSink(path, flush_every=2, flush_seconds=3600)
+    sink.write(Path("a.mp4"), Path("a.mp3"), "a")
+    assert path.read_text() == ""
+    sink.write(Path("b.mp4"), Path("b.mp3"), "b")
+    assert len(path.read_text().splitlines()) == 2
+    sink.close()
+
+
+def test_run_batch_writes_to_sink_and_skips_done(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test run_batch streams results into the sink and resumes from it."""
+    flow = MagicMock(side_effect=lambda path: (path.with_suffix(".mp3"), path.stem))
+    monkeypatch.setattr("twat_task.scheduling.process_video_flow", flow)
+    videos = [tmp_path / f"v{i}.mp4" for i in range(4)]
+    path = tmp_path / "results.jsonl"
+
+    with JsonlSink(path) as sink:
+        assert run_batch(videos[:2], max_workers=2, sink=sink) == []
+    with JsonlSink(path) as sink:
+        run_batch(videos, max_workers=2, sink=sink)
+
+    assert flow.call_count == 4
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(r["transcript"] for r in records) == ["v0", "v1", "v2", "v3"]
+
+
+def test_run_batch_sink_keeps_results_when_a_video_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a failing video does not discard the results of the others."""
+
+    def flow(path: Path) -> tuple[Path, str]:
+        if path.stem == "v0":
+            msg = "broken video"
+            raise RuntimeError(msg)
+        return path.with_suffix(".mp3"), path.stem
+
+    monkeypatch.setattr("twat_task.scheduling.process_video_flow", flow)
+    videos = [tmp_path / f"v{i}.mp4" for i in range(8)]
+    path = tmp_path / "results.jsonl"
+
+    with JsonlSink(path) as sink, pytest.raises(BatchError) as info:
+        run_batch(videos, policy="fifo", max_workers=1, sink=sink)
+
+    assert list(info.value.failures) == [videos[0]]
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert sorted(r["transcript"] for r in records) == [f"v{i}" for i in range(1, 8)]
+
+
+def test_run_batch_flushes_sink_while_idle(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test buffered records are flushed while the remaining videos stall."""
+    path = tmp_path / "results.jsonl"
+    sink = JsonlSink(path, flush_every=100, flush_seconds=0.05)
+    seen_on_disk = []
+
+    def flow(video: Path) -> tuple[Path, str]:
+        if video.stem == "slow":
+            time.sleep(0.3)
+            seen_on_disk.append(path.read_text().count("\n"))
+        return video.with_suffix(".mp3"), video.stem
+
+    monkeypatch.setattr("twat_task.scheduling.process_video_flow", flow)
+    run_batch(
+        [tmp_path / "fast.mp4", tmp_path / "slow.mp4"],
+        policy="fifo",
+        max_workers=2,
+        sink=sink,
+    )
+    sink.close()
+
+    assert seen_on_disk == [1]
+
+
+def test_incomplete_sink_fails_at_instantiation(tmp_path: Path) -> None:
+    """Test a subclass missing sink methods cannot be created."""
+
+    class Incomplete(ResultSink):
+        def _load_keys(self) -> set[str]:
+            return set()
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()  # type: ignore[abstract]
+
+
+def test_parquet_sink_writes_parts_and_resumes(tmp_path: Path) -> None:
+    """Test part files are written per flush and read back on reopen."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    directory = tmp_path / "results"
+    with ParquetSink(directory, flush_every=2) as sink:
+        for name in "abc":
+            sink.write(Path(f"{name}.mp4"), Path(f"{name}.mp3"), name)
+
+    assert len(list(directory.glob("part-*.parquet"))) == 2
+    with ParquetSink(directory) as sink:
+        assert Path("c.mp4") in sink
+        assert not sink.write(Path("a.mp4"), Path("a.mp3"), "again")
+    table = pq.read_table(directory)
+    assert sorted(table.column("transcript").to_pylist()) == ["a", "b", "c"]
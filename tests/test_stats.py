@@ -0,0 +1,12 @@
+"""Unit tests for the statistics helpers in twat_task.stats."""
+
+import pytest
+from twat_task.stats import percentile
+
+
+def test_percentile_interpolates() -> None:
+    """Test percentile uses linear interpolation between ranks."""
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == pytest.approx(2.5)
+    assert percentile([5.0], 99) == 5.0
+    with pytest.raises(ValueError):
+        percentile([], 50)
@@ -0,0 +1,55 @@
+"""Unit tests for transcript artifacts in twat_task.subtitles."""
+
+from pathlib import Path
+
+import pytest
+from twat_task.subtitles import (
+    Segment,
+    artifact_path,
+    load_segments,
+    render_srt,
+    render_vtt,
+    write_artifacts,
+)
+
+SEGMENTS = [
+    Segment(start=0, end=30, text="hello world"),
+    Segment(start=3630, end=3660.5, text="being processed"),
+]
+
+
+def test_render_srt() -> None:
+    """Test SubRip cues are numbered and use comma milliseconds."""
+    assert render_srt(SEGMENTS) == (
+        "1\n00:00:00,000 --> 00:00:30,000\nhello world\n"
+        "\n"
+        "2\n01:00:30,000 --> 01:01:00,500\nbeing processed\n"
+    )
+
+
+def test_render_vtt() -> None:
+    """Test WebVTT output has a header and dot milliseconds."""
+    assert render_vtt(SEGMENTS) == (
+        "WEBVTT\n"
+        "\n"
+        "00:00:00.000 --> 00:00:30.000\nhello world\n"
+        "\n"
+        "01:00:30.000 --> 01:01:00.500\nbeing processed\n"
+    )
+
+
+def test_write_artifacts_round_trip(tmp_path: Path) -> None:
+    """Test artifacts are written next to the audio and segments reload."""
+    audio = tmp_path / "clip.mp3"
+    written = write_artifacts(audio, SEGMENTS, ["segments", "srt", "txt", "srt"])
+
+    assert written == {
+        "segments": tmp_path / "clip.segments.json",
+        "srt": tmp_path / "clip.srt",
+        "txt": tmp_path / "clip.txt",
+    }
+    assert load_segments(written["segments"]) == SEGMENTS
+    assert written["txt"].read_text() == "hello world being processed"
+
+    with pytest.raises(ValueError):
+        artifact_path(audio, "docx")
@@ -5,6 +5,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch # Added Mock for type hint
 
 import pytest
+from twat_task.subtitles import load_segments
 from twat_task.task import extract_audio_task, generate_transcript_task
 
 
@@ -93,3 +94,54 @@ def test_generate_transcript_task_simulates_processing(tmp_path: Path) -> None:
         expected_sleep_calls = 1 + (duration_from_mock // 30)
         # Ruff S101: allow assert
         assert mock_sleep.call_count == expected_sleep_calls
+
+
+def test_generate_transcript_task_writes_artifacts_in_one_pass(tmp_path: Path) -> None:
+    """Test extra artifacts are rendered from the same chunk pass."""
+    audio_file = tmp_path / "test_audio.mp3"
+    audio_file.write_text(json.dumps({"duration": 95, "codec": "aac"}))
+
+    with patch("time.sleep") as mock_sleep:
+        transcript = generate_transcript_task.fn(
+            audio_path=audio_file, artifacts=("segments", "srt", "vtt")
+        )
+        # Same number of simulated calls as without artifacts: 1 + 95 // 30
+        assert mock_sleep.call_count == 1 + 3
+
+    segments = load_segments(tmp_path / "test_audio.segments.json")
+    assert [(s.start, s.end) for s in segments] == [(0, 30), (30, 60), (60, 90)]
+    assert " ".join(s.text for s in segments) == transcript
+    assert (tmp_path / "test_audio.srt").read_text().startswith("1\n00:00:00,000")
+    assert (tmp_path / "test_audio.vtt").read_text().startswith("WEBVTT")
+
+
+def test_generate_transcript_task_time_range_reuses_chunks(tmp_path: Path) -> None:
+    """Test a time range only processes overlapping chunks, once."""
+    audio_file = tmp_path / "test_audio.mp3"
+    audio_file.write_text(json.dumps({"duration": 7200, "codec": "aac"}))
+
+    with patch("time.sleep") as mock_sleep:
+        excerpt = generate_transcript_task.fn(audio_path=audio_file, start=600, end=720)
+        # 1 setup call + chunks 20..23
+        assert mock_sleep.call_count == 1 + 4
+
+        mock_sleep.reset_mock()
+        wider = generate_transcript_task.fn(audio_path=audio_file, start=570, end=720)
+        # Only chunk 19 is new
+        assert mock_sleep.call_count == 1 + 1
+
+    assert wider.endswith(excerpt)
+
+
+def test_generate_transcript_task_rejects_unknown_artifact_first(
+    tmp_path: Path,
+) -> None:
+    """Test an unknown artifact kind fails before any chunk is transcribed."""
+    audio_file = tmp_path / "test_audio.mp3"
+    audio_file.write_text(json.dumps({"duration": 600, "codec": "aac"}))
+
+    with patch("time.sleep") as mock_sleep, pytest.raises(ValueError, match="docx"):
+        generate_transcript_task.fn(audio_path=audio_file, artifacts=("srt", "docx"))
+
+    mock_sleep.assert_not_called()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["test_audio.mp3"]
@@ -1,5 +1,8 @@
 """Integration tests for the VideoTranscript model in twat_task.task."""
 
+import gc
+import json
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -127,3 +130,175 @@ def test_video_transcript_access_order_calls_flow_once(
     ap2 = vt2.audio_path
     assert ap2 == expected_audio
     mock_process_video_flow.fn.assert_called_once()
+
+
+def test_video_transcript_for_path_interns_instances(tmp_path: Path) -> None:
+    """Test for_path returns one shared instance per resolved file."""
+    video_file = tmp_path / "test_video.mp4"
+    video_file.touch()
+
+    vt = VideoTranscript.for_path(video_file)
+    assert vt.video_path == video_file
+    assert VideoTranscript.for_path(tmp_path / "." / "test_video.mp4") is vt
+    assert VideoTranscript.for_path(str(video_file)) is vt
+    assert VideoTranscript.for_path(tmp_path / "other.mp4") is not vt
+
+
+def test_video_transcript_many_validates_and_deduplicates(tmp_path: Path) -> None:
+    """Test many validates the whole list and de-duplicates paths."""
+    paths = [str(tmp_path / f"video_{i % 3}.mp4") for i in range(9)]
+
+    instances = VideoTranscript.many(paths)
+    assert len(instances) == 9
+    assert len({id(vt) for vt in instances}) == 3
+    assert instances[0] is instances[3] is instances[6]
+    assert instances[1].video_path == tmp_path / "video_1.mp4"
+
+    with pytest.raises(ValidationError):
+        VideoTranscript.many([tmp_path / "ok.mp4", 42])  # type: ignore[list-item]
+
+
+def test_video_transcript_registry_is_weak(tmp_path: Path) -> None:
+    """Test interned instances are dropped once no caller holds them."""
+    video_file = tmp_path / "test_video.mp4"
+    key = (VideoTranscript, video_file.resolve(), None, None)
+    vt = VideoTranscript.for_path(video_file)
+    assert VideoTranscript._registry[key] is vt
+
+    del vt
+    gc.collect()
+    assert key not in VideoTranscript._registry
+
+
+def test_video_transcript_dump_many_skip_does_no_work(
+    tmp_path: Path, mock_process_video_flow: MagicMock
+) -> None:
+    """Test dump_many with missing='skip' only emits computed fields."""
+    mock_process_video_flow.side_effect = lambda path, **_: (
+        path.with_suffix(".mp3"),
+        f"transcript of {path.stem}",
+    )
+    done, pending = VideoTranscript.many([tmp_path / "a.mp4", tmp_path / "b.mp4"])
+    assert done.text_transcript == "transcript of a"
+    mock_process_video_flow.reset_mock()
+
+    records = VideoTranscript.dump_many([done, pending], missing="skip")
+
+    mock_process_video_flow.assert_not_called()
+    assert records == [
+        {
+            "video_path": tmp_path / "a.mp4",
+            "start_time": None,
+            "end_time": None,
+            "audio_path": tmp_path / "a.mp3",
+            "text_transcript": "transcript of a",
+        },
+        {"video_path": tmp_path / "b.mp4", "start_time": None, "end_time": None},
+    ]
+
+
+def test_video_transcript_dump_many_computes_batch(
+    tmp_path: Path, mock_process_video_flow: MagicMock
+) -> None:
+    """Test dump_many with missing='compute' processes each video once."""
+    mock_process_video_flow.side_effect = lambda path, **_: (
+        path.with_suffix(".mp3"),
+        f"transcript of {path.stem}",
+    )
+    paths = [tmp_path / f"video_{i % 4}.mp4" for i in range(8)]
+    transcripts = VideoTranscript.many(paths)
+
+    payload = VideoTranscript.dump_many_json(
+        transcripts, missing="compute", max_workers=4
+    )
+
+    assert mock_process_video_flow.call_count == 4
+    records = json.loads(payload)
+    assert len(records) == 8
+    assert records[5]["text_transcript"] == "transcript of video_1"
+    assert records[5]["audio_path"] == str(tmp_path / "video_1.mp3")
+
+
+def test_video_transcript_start_runs_in_background(
+    tmp_path: Path, mock_process_video_flow: MagicMock
+) -> None:
+    """Test start() processes in the background and attributes reuse the run."""
+    release = threading.Event()
+    expected = (tmp_path / "a.mp3", "background transcript")
+
+    def slow_flow(path: Path, **_: object) -> tuple[Path, str]:
+        release.wait(timeout=5)
+        return expected
+
+    mock_process_video_flow.side_effect = slow_flow
+    vt = VideoTranscript(video_path=tmp_path / "a.mp4")
+
+    future = vt.start()
+    assert vt.start() is future
+    assert not future.done()
+
+    release.set()
+    assert future.result(timeout=5) == expected
+    assert vt.text_transcript == "background transcript"
+    assert vt.audio_path == tmp_path / "a.mp3"
+    mock_process_video_flow.assert_called_once_with(
+        tmp_path / "a.mp4", start=None, end=None
+    )
+
+
+def test_video_transcript_prefetch_retries_failures(
+    tmp_path: Path, mock_process_video_flow: MagicMock
+) -> None:
+    """Test prefetch() starts every video and failed runs are retried."""
+    mock_process_video_flow.side_effect = [
+        RuntimeError("transient"),
+        (tmp_path / "a.mp3", "second try"),
+    ]
+    vt = VideoTranscript(video_path=tmp_path / "a.mp4")
+
+    (future,) = VideoTranscript.prefetch([vt])
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+
+    assert vt.text_transcript == "second try"
+    assert mock_process_video_flow.call_count == 2
+
+
+def test_video_transcript_time_range(
+    tmp_path: Path, mock_process_video_flow: MagicMock
+) -> None:
+    """Test a time range is part of the identity and reaches the flow."""
+    video_file = tmp_path / "long.mp4"
+    full = VideoTranscript.for_path(video_file)
+    excerpt = VideoTranscript.for_path(video_file, start_time=60, end_time=180)
+
+    assert excerpt is not full
+    assert VideoTranscript.for_path(video_file, start_time=60, end_time=180) is excerpt
+
+    assert excerpt.text_transcript == "mock transcript"
+    mock_process_video_flow.assert_called_once_with(video_file, start=60, end=180)
+
+
+def test_video_transcript_many_validates_time_range(tmp_path: Path) -> None:
+    """Test invalid time ranges are rejected before an instance is interned."""
+    video_file = tmp_path / "long.mp4"
+    with pytest.raises(ValidationError):
+        VideoTranscript.many([video_file], start_time="soon")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="after its start"):
+        VideoTranscript.for_path(video_file, start_time=120, end_time=60)
+    with pytest.raises(ValueError, match="negative"):
+        VideoTranscript.for_path(video_file, start_time=-1)
+
+    excerpt = VideoTranscript.for_path(video_file, start_time="60", end_time=120)  # type: ignore[arg-type]
+    assert excerpt.start_time == 60.0
+
+
+def test_video_transcript_constructor_validates_time_range() -> None:
+    """Test the constructor applies the same range rule as the factories."""
+    with pytest.raises(ValidationError, match="after its start"):
+        VideoTranscript(video_path=Path("x.mp4"), start_time=120, end_time=60)
+    with pytest.raises(ValidationError, match="negative"):
+        VideoTranscript(video_path=Path("x.mp4"), end_time=-5)
+
+    excerpt = VideoTranscript(video_path=Path("x.mp4"), start_time=60, end_time=120)
+    assert (excerpt.start_time, excerpt.end_time) == (60.0, 120.0)
@@ -0,0 +1,116 @@
+"""Unit tests for the SQLite work queue in twat_task.workqueue."""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from twat_task.workqueue import Job, WorkQueue, process_job, run_worker, run_workers
+
+
+@pytest.fixture
+def videos(tmp_path: Path) -> list[Path]:
+    """Create a few dummy videos with pre-extracted mock audio."""
+    paths = []
+    for i in range(6):
+        video = tmp_path / f"video_{i}.mp4"
+        video.touch()
+        video.with_suffix(".mp3").write_text(json.dumps({"duration": 60 + 30 * i}))
+        paths.append(video)
+    return paths
+
+
+def test_enqueue_claim_complete(tmp_path: Path, videos: list[Path]) -> None:
+    """Test the basic job lifecycle and de-duplication on enqueue."""
+    queue = WorkQueue(tmp_path / "jobs.sqlite")
+    assert queue.enqueue(videos[:2], artifacts=["srt"], start=0, end=60) == 2
+    assert queue.enqueue(videos[:3]) == 1
+
+    job = queue.claim("worker-a")
+    assert job is not None
+    assert job.video_path == videos[0]
+    assert job.artifacts == ("srt",)
+    assert (job.start, job.end, job.attempts) == (0, 60, 1)
+    assert queue.heartbeat(job.id, "worker-a")
+    assert not queue.heartbeat(job.id, "worker-b")
+
+    assert queue.complete(job.id, "worker-a", videos[0].with_suffix(".mp3"), "text")
+    assert queue.counts() == {"done": 1, "queued": 2}
+    assert queue.results() == [(videos[0], videos[0].with_suffix(".mp3"), "text")]
+
+
+def test_expired_lease_is_requeued(tmp_path: Path, videos: list[Path]) -> None:
+    """Test a job whose worker stopped heartbeating goes to another worker."""
+    queue = WorkQueue(tmp_path / "jobs.sqlite", lease_seconds=0.05, max_attempts=2)
+    queue.enqueue(videos[:1])
+
+    stalled = queue.claim("worker-a")
+    assert stalled is not None
+    time.sleep(0.1)
+
+    retried = queue.claim("worker-b")
+    assert retried is not None
+    assert retried.id == stalled.id
+    assert retried.attempts == 2
+    # The stalled worker lost its lease and cannot overwrite the result.
+    assert not queue.complete(stalled.id, "worker-a", Path("late.mp3"), "late")
+
+    time.sleep(0.1)
+    assert queue.requeue_expired() == 1
+    assert queue.counts() == {"failed": 1}
+
+
+def test_process_job_runs_the_flow_steps(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a job extracts missing audio and forwards its parameters like the flow."""
+    monkeypatch.setattr("time.sleep", lambda *_: None)
+    video = tmp_path / "new.mp4"
+    video.touch()
+
+    job = Job(id=1, video_path=video, artifacts=("srt",), start=0, end=60)
+    audio, transcript = process_job(job)
+    assert audio == video.with_suffix(".mp3")
+    assert audio.exists()
+    assert audio.with_suffix(".srt").exists()
+    assert transcript
+
+    other = tmp_path / "other.mp4"
+    with pytest.raises(ValueError, match="docx"):
+        process_job(Job(id=2, video_path=other, artifacts=("docx",)))
+    assert not other.with_suffix(".mp3").exists()
+
+
+def test_run_worker_records_failures(
+    tmp_path: Path, videos: list[Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a failing job is retried, then marked as failed."""
+
+    def broken(*args: object, **kwargs: object) -> str:
+        msg = "backend down"
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr("twat_task.workqueue.generate_transcript_task.fn", broken)
+    db = tmp_path / "jobs.sqlite"
+    WorkQueue(db).enqueue(videos[:1])
+
+    assert run_worker(db, max_attempts=2) == 0
+    assert WorkQueue(db).counts() == {"failed": 1}
+
+
+def test_run_workers_drains_queue_with_processes(
+    tmp_path: Path, videos: list[Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test several local worker processes share the queue without overlap."""
+    monkeypatch.setattr("time.sleep", lambda *_: None)
+    db = tmp_path / "jobs.sqlite"
+    queue = WorkQueue(db)
+    queue.enqueue(videos)
+
+    exit_codes = run_workers(db, processes=3, start_method="fork", poll_seconds=0.01)
+
+    assert exit_codes == [0, 0, 0]
+    assert queue.counts() == {"done": 6}
+    results = queue.results()
+    assert [video for video, _, _ in results] == videos
+    assert all(text for _, _, text in results)